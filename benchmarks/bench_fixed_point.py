@@ -0,0 +1,107 @@
+"""Benchmark of the money representations: float64 dollars, int64 cents and Python Decimal.
+
+Each one parses a "Current Value" column, sums it per group (as group_positions does),
+then takes the grand total and the percentages. The Decimal results are exact and
+serve as the reference: for the other two the benchmark counts the group sums whose
+"${:,.2f}" rendering differs from it and the largest error of any sum before rounding.
+
+Run from the repository root:
+
+    python benchmarks/bench_fixed_point.py
+    python benchmarks/bench_fixed_point.py --cells 1000000 5000000 --groups 50
+"""
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_money import make_money_column  # noqa: E402
+from money import format_cents, parse_cents, parse_money  # noqa: E402
+
+
+def parse_decimal(values: pd.Series) -> pd.Series:
+    def to_decimal(cell: str) -> Decimal:
+        if cell == "--":
+            return Decimal(0)
+        return Decimal(cell.replace("$", "").replace(",", ""))
+
+    return values.map(to_decimal).astype(object)
+
+
+def aggregate(parse, values: pd.Series, groups: pd.Series) -> tuple[pd.Series, object]:
+    amounts = parse(values)
+    by_group = amounts.groupby(groups, observed=True).sum()
+    total = by_group.sum()
+    # Percentages as group_positions computes them: timed, not compared
+    if isinstance(total, Decimal):
+        by_group.map(lambda v: v / total * 100)
+    else:
+        (by_group / total) * 100
+    return by_group, total
+
+
+def best_of(func, repeat: int) -> tuple[float, tuple]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cells", type=int, nargs="+", default=[1_000_000, 3_000_000])
+    parser.add_argument("--groups", type=int, default=20, help="number of groups the cells are summed into")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    formats = {
+        "float64 dollars": "${:,.2f}".format,
+        "int64 cents": format_cents,
+        "Decimal": lambda v: "${:,.2f}".format(v),
+    }
+    candidates = {"float64 dollars": parse_money, "int64 cents": parse_cents, "Decimal": parse_decimal}
+
+    as_decimal = {
+        "float64 dollars": lambda v: Decimal(float(v)),
+        "int64 cents": lambda v: Decimal(int(v)) / 100,
+        "Decimal": lambda v: v,
+    }
+
+    print(
+        f"{'cells':>10}  {'representation':<16} {'seconds':>8} {'Mcells/s':>9} "
+        f"{'groups off':>11} {'total off':>10} {'max error $':>12}"
+    )
+    for n_cells in args.cells:
+        values = make_money_column(n_cells)
+        rng = np.random.default_rng(1)
+        groups = pd.Series(pd.Categorical.from_codes(rng.integers(0, args.groups, n_cells), [f"G{i}" for i in range(args.groups)]))
+
+        results = {}
+        for label, parse in candidates.items():
+            seconds, results[label] = best_of(lambda: aggregate(parse, values, groups), args.repeat)
+            results[label] = (seconds, *results[label])
+
+        exact_groups = [formats["Decimal"](v) for v in results["Decimal"][1]]
+        exact_total = formats["Decimal"](results["Decimal"][2])
+        reference = [*results["Decimal"][1], results["Decimal"][2]]
+        for label, (seconds, by_group, total) in results.items():
+            rendered = [formats[label](v) for v in by_group]
+            groups_off = sum(a != b for a, b in zip(rendered, exact_groups))
+            total_off = formats[label](total) != exact_total
+            max_error = max(abs(as_decimal[label](v) - r) for v, r in zip([*by_group, total], reference))
+            print(
+                f"{n_cells:>10,}  {label:<16} {seconds:>8.3f} {n_cells / seconds / 1e6:>9.2f} "
+                f"{groups_off:>11} {'yes' if total_off else 'no':>10} {float(max_error):>12.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
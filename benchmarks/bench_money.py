@@ -0,0 +1,71 @@
+"""Micro-benchmark of money parsing for the "Current Value" column.
+
+Compares the original regex + to_numeric cleaning with money.parse_money.
+
+Run from the repository root:
+
+    python benchmarks/bench_money.py
+    python benchmarks/bench_money.py --cells 5000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import money  # noqa: E402
+
+
+def make_money_column(n_cells: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    amounts = rng.uniform(-50_000, 500_000, n_cells).round(2)
+    cells = pd.Series([f"-${-v:,.2f}" if v < 0 else f"${v:,.2f}" for v in amounts], dtype="str")
+    # Sprinkle in "--" placeholders like the exports have
+    cells[rng.random(n_cells) < 0.02] = "--"
+    return cells
+
+
+def parse_money_regex(values: pd.Series) -> pd.Series:
+    # The original cleaning from main()
+    values = values.astype(str).str.replace(r"[\$,]", "", regex=True).replace("--", "0")
+    return pd.to_numeric(values, errors="coerce")
+
+
+def best_of(func, values: pd.Series, repeat: int) -> tuple[float, pd.Series]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(values)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cells", type=int, nargs="+", default=[1_000_000, 3_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    candidates = {"regex + to_numeric": parse_money_regex, "parse_money": money.parse_money}
+    if money.pa is not None:
+        candidates["parse_money (pandas fallback)"] = lambda v: pd.Series(money._parse_money_pandas(v))
+
+    print(f"{'cells':>10}  {'method':<30} {'seconds':>8} {'Mcells/s':>9}")
+    for n_cells in args.cells:
+        values = make_money_column(n_cells)
+        expected = None
+        for label, func in candidates.items():
+            seconds, result = best_of(func, values, args.repeat)
+            if expected is None:
+                expected = result.to_numpy()
+            else:
+                np.testing.assert_allclose(result.to_numpy(), expected)
+            print(f"{n_cells:>10,}  {label:<30} {seconds:>8.3f} {n_cells / seconds / 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
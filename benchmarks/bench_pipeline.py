@@ -0,0 +1,201 @@
+"""Per-stage benchmark of the report pipeline on synthetic broker exports.
+
+Writes a Fidelity-style and a Schwab-style export of each requested size, runs the
+pipeline stages on them (read, normalize, concat, group, merge, write) and reports
+wall time, peak RSS and rows per second for every stage. Results can be saved as
+JSON and compared against an earlier run.
+
+Run from the repository root:
+
+    python benchmarks/bench_pipeline.py --rows 10000 100000 --json before.json
+    python benchmarks/bench_pipeline.py --rows 10000 100000 --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brokers import (  # noqa: E402
+    BROKERS, concat_positions, group_positions, merge_grouped, normalize_positions,
+)
+from exports import write_outputs  # noqa: E402
+from readers import read_fidelity_positions, read_schwab_positions  # noqa: E402
+from synthetic import write_fidelity_export, write_schwab_export  # noqa: E402
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return None
+
+
+class PeakRss:
+    # Samples resident memory from /proc/self/statm while a stage runs (Linux).
+    # Elsewhere it falls back to ru_maxrss, the high-water mark of the whole process.
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_bytes() or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if _rss_bytes() is None:
+            self._thread = None
+        else:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread is None:
+            # ru_maxrss is in KiB on Linux, bytes on macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+        else:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, _rss_bytes() or 0)
+
+
+def run_pipeline(fidelity_path: str, schwab_path: str, out_dir: str) -> list[tuple[str, int, float, int]]:
+    # Runs every stage once; returns (stage, rows, seconds, peak RSS bytes) per stage
+    results = []
+    state = {}
+
+    def stage(name: str, func):
+        with PeakRss() as rss:
+            start = time.perf_counter()
+            rows = func()
+            seconds = time.perf_counter() - start
+        results.append((name, rows, seconds, rss.peak))
+
+    def read_fidelity():
+        state["fidelity"] = read_fidelity_positions(fidelity_path)
+        return len(state["fidelity"])
+
+    def read_schwab():
+        state["charles"] = read_schwab_positions(schwab_path)
+        return len(state["charles"])
+
+    def normalize():
+        state["positions"] = {
+            name: normalize_positions(BROKERS[name], state[name], path)
+            for name, path in [("fidelity", fidelity_path), ("charles", schwab_path)]
+        }
+        return sum(len(p) for p in state["positions"].values())
+
+    def concat():
+        state["all"] = concat_positions(list(state["positions"].values()))
+        return len(state["all"])
+
+    def group():
+        state["grouped"] = {name: group_positions(p) for name, p in state["positions"].items()}
+        return len(state["all"])
+
+    def merge():
+        state["merged"], _ = merge_grouped(state["grouped"])
+        return sum(len(g) for g in state["grouped"].values())
+
+    def write():
+        tables = {**state["grouped"], "merged": state["merged"]}
+        write_outputs({os.path.join(out_dir, f"grouped_{name}.csv"): table for name, table in tables.items()})
+        return sum(len(t) for t in tables.values())
+
+    for name, func in [
+        ("read_fidelity", read_fidelity), ("read_schwab", read_schwab), ("normalize", normalize),
+        ("concat", concat), ("group", group), ("merge", merge), ("write_csv", write),
+    ]:
+        stage(name, func)
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="rows per synthetic export")
+    parser.add_argument("--repeat", type=int, default=3, help="keep the fastest of this many runs per stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r["rows"], r["stage"]): r for r in json.load(f)["results"]}
+
+    records = []
+    header = f"{'rows':>9}  {'stage':<14} {'seconds':>9} {'peak RSS MB':>12} {'rows/s':>12}"
+    print(header + (f" {'vs baseline':>12}" if baseline else ""))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            fidelity_path = write_fidelity_export(os.path.join(tmp, f"fidelity_{n_rows}.csv"), n_rows, args.seed)
+            schwab_path = write_schwab_export(os.path.join(tmp, f"schwab_{n_rows}.csv"), n_rows, args.seed)
+            best = {}
+            for _ in range(args.repeat):
+                for stage, rows, seconds, peak in run_pipeline(fidelity_path, schwab_path, tmp):
+                    previous = best.get(stage)
+                    best[stage] = (
+                        rows,
+                        min(seconds, previous[1]) if previous else seconds,
+                        max(peak, previous[2]) if previous else peak,
+                    )
+            for stage, (rows, seconds, peak) in best.items():
+                record = {
+                    "rows": n_rows, "stage": stage, "stage_rows": rows, "seconds": seconds,
+                    "peak_rss_mb": peak / 2**20, "rows_per_second": rows / seconds if seconds else None,
+                }
+                records.append(record)
+                line = (
+                    f"{n_rows:>9,}  {stage:<14} {seconds:>9.4f} {record['peak_rss_mb']:>12.1f} "
+                    f"{record['rows_per_second'] or 0:>12,.0f}"
+                )
+                if (n_rows, stage) in baseline:
+                    line += f" {baseline[(n_rows, stage)]['seconds'] / seconds:>11.2f}x"
+                print(line)
+
+    if args.json_path:
+        meta = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        }
+        with open(args.json_path, "w") as f:
+            json.dump({"meta": meta, "results": records}, f, indent=2)
+        print(f"\nSaved results to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
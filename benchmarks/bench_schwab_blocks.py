@@ -0,0 +1,81 @@
+"""Compare the vectorized Schwab block splitter against the original row loop.
+
+Run from the repository root:
+
+    python benchmarks/bench_schwab_blocks.py
+    python benchmarks/bench_schwab_blocks.py --sizes 10000 100000 --loop-max 100000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from readers import split_schwab_blocks  # noqa: E402
+from synthetic import schwab_export_lines  # noqa: E402
+
+
+def make_schwab_frame(n_rows: int) -> pd.DataFrame:
+    # Parse a synthetic Schwab export the way read_schwab_positions() does
+    export = b"".join(schwab_export_lines(n_rows))
+    return pd.read_csv(io.BytesIO(export), encoding="latin1", skip_blank_lines=True)
+
+
+def split_schwab_blocks_loop(df_charles: pd.DataFrame) -> pd.DataFrame:
+    # The original row-by-row implementation from main(), kept as the baseline
+    blocks = []
+    i = 0
+    while i < len(df_charles):
+        if str(df_charles.iloc[i, 0]).strip() == "Symbol":
+            account_name = str(df_charles.iloc[i - 2, 0]).strip() if i > 1 else ""
+            header = df_charles.iloc[i].tolist()
+            j = i + 1
+            while j < len(df_charles) and str(df_charles.iloc[j, 0]).strip() != "Symbol":
+                if not df_charles.iloc[j].isnull().all() and not all(str(x).strip() == "" for x in df_charles.iloc[j]):
+                    blocks.append([account_name] + df_charles.iloc[j].tolist())
+                j += 1
+            i = j
+        else:
+            i += 1
+    if not blocks:
+        return pd.DataFrame()
+    df_charles_clean = pd.DataFrame(blocks, columns=["Account Name"] + header)
+    if "Mkt Val (Market Value)" in df_charles_clean.columns:
+        df_charles_clean = df_charles_clean.rename(columns={"Mkt Val (Market Value)": "Current Value"})
+    account_names = set(df_charles_clean["Account Name"].dropna().unique())
+    return df_charles_clean[~df_charles_clean["Symbol"].isin(account_names.union({"Account Total"}))]
+
+
+def time_call(func, *args) -> tuple[float, pd.DataFrame]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--loop-max", type=int, default=None,
+                        help="skip the row loop above this many rows (it takes minutes at 1M)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'loop (s)':>10} {'vectorized (s)':>15} {'speedup':>9}")
+    for n_rows in args.sizes:
+        df_charles = make_schwab_frame(n_rows)
+        vec_time, vec_result = time_call(split_schwab_blocks, df_charles)
+        if args.loop_max is not None and n_rows > args.loop_max:
+            print(f"{n_rows:>10,} {'skipped':>10} {vec_time:>15.4f} {'':>9}")
+            continue
+        loop_time, loop_result = time_call(split_schwab_blocks_loop, df_charles)
+        pd.testing.assert_frame_equal(
+            loop_result.reset_index(drop=True), vec_result.reset_index(drop=True), check_dtype=False
+        )
+        print(f"{n_rows:>10,} {loop_time:>10.3f} {vec_time:>15.4f} {loop_time / vec_time:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Synthetic broker exports for the benchmarks.
+
+Fidelity-style exports reproduce the quirks read_csv_no_trailing_commas deals with:
+a UTF-8 BOM in the header, a trailing comma on every data row, latin1 bytes in
+descriptions, "--" values, "**" cash symbols, "Pending activity" rows and the
+disclaimer footer. Schwab-style exports stack one block per account (account
+name, empty row, "Symbol" header, positions, cash and "Account Total" rows).
+"""
+import os
+
+import numpy as np
+
+FIDELITY_HEADER = [
+    "Account Number", "Account Name", "Symbol", "Description", "Quantity", "Last Price",
+    "Last Price Change", "Current Value", "Today's Gain/Loss Dollar", "Type",
+]
+FIDELITY_ACCOUNTS = [
+    ("Z11111111", "Individual - TOD"), ("Z22222222", "ROTH IRA"), ("Z33333333", "Traditional IRA"),
+    ("32213", "Geospace Technologies"), ("X77788987", "Cash Management"),
+]
+FIDELITY_CASH_SYMBOLS = ["SPAXX**", "FDRXX**", "CORE**"]
+
+SCHWAB_HEADER = [
+    "Symbol", "Description", "Qty (Quantity)", "Price", "Price Chng $ (Price Change $)",
+    "Mkt Val (Market Value)", "Day Chng $ (Day Change $)", "Security Type",
+]
+
+
+def _money(value: float) -> str:
+    return f"-${-value:,.2f}" if value < 0 else f"${value:,.2f}"
+
+
+def _symbols(n_symbols: int) -> list[str]:
+    return [f"S{i:04d}" for i in range(n_symbols)]
+
+
+def fidelity_export_lines(n_rows: int, seed: int = 0, n_symbols: int = 500):
+    # Yields the export as latin1-encoded lines
+    rng = np.random.default_rng(seed)
+    symbols = _symbols(n_symbols)
+    kinds = rng.random(n_rows)
+    accounts = rng.integers(0, len(FIDELITY_ACCOUNTS), n_rows)
+    symbol_ids = rng.integers(0, n_symbols, n_rows)
+    values = rng.uniform(1, 250_000, n_rows)
+
+    yield ("﻿" + ",".join(FIDELITY_HEADER) + "\r\n").encode("utf-8")
+    for kind, account, symbol_id, value in zip(kinds, accounts, symbol_ids, values):
+        number, name = FIDELITY_ACCOUNTS[account]
+        if kind < 0.1:
+            symbol = FIDELITY_CASH_SYMBOLS[symbol_id % len(FIDELITY_CASH_SYMBOLS)]
+            fields = [number, name, symbol, "HELD IN MONEY MARKET", "", "", "", _money(value), "", "Cash"]
+        elif kind < 0.12:
+            fields = [number, name, "Pending activity", "", "", "", "", _money(value - 125_000), "", ""]
+        elif kind < 0.15:
+            symbol = symbols[symbol_id]
+            fields = [number, name, symbol, f"{symbol} SOCI\xc9T\xc9", "10", "--", "--", "--", "--", "Margin"]
+        else:
+            symbol = symbols[symbol_id]
+            fields = [
+                number, name, symbol, f"{symbol} HOLDINGS CAF\xc9", "10.000", "$12.34", "+$0.10",
+                _money(value), _money(value / 100 - 1_000), "Cash",
+            ]
+        yield (",".join(f'"{f}"' if "," in f else f for f in fields) + ",\r\n").encode("latin1")
+    yield b"\r\n"
+    yield b'"The data and information in this spreadsheet is provided to you solely for your use."\r\n'
+    yield b'"Brokerage services are provided by Fidelity Brokerage Services LLC (FBS)."\r\n'
+    yield b'"Date downloaded Oct-18-2026 10:00 p.m ET"\r\n'
+
+
+def schwab_export_lines(n_rows: int, seed: int = 0, rows_per_account: int = 50, n_symbols: int = 500):
+    # Yields the export as latin1-encoded lines; every line has the same number of fields
+    rng = np.random.default_rng(seed)
+    symbols = _symbols(n_symbols) + ["SGOV", "SGVT"]
+    width = len(SCHWAB_HEADER)
+
+    def line(fields: list[str]) -> bytes:
+        fields = fields + [""] * (width - len(fields))
+        return (",".join(f'"{f}"' if f else "" for f in fields) + "\n").encode("latin1")
+
+    yield line(["Positions for All-Accounts as of 10:00 PM ET, 10/17/2026"])
+    yield b"\n"
+    n_accounts = max(1, n_rows // rows_per_account)
+    for a in range(n_accounts):
+        yield line([f"Account_{a} ...{a % 1000:03d}"])
+        yield line([])
+        yield line(SCHWAB_HEADER)
+        symbol_ids = rng.integers(0, len(symbols), rows_per_account - 5)
+        values = rng.uniform(1, 100_000, rows_per_account - 5)
+        for symbol_id, value in zip(symbol_ids, values):
+            symbol = symbols[symbol_id]
+            yield line([symbol, f"{symbol} FUND", "10", "$10.00", "$0.01", _money(value), "$1.00", "ETFs & Closed End Funds"])
+        yield line(["Cash & Cash Investments", "--", "--", "--", "--", _money(rng.uniform(0, 50_000)), "--", "Cash and Money Market"])
+        yield line(["Account Total", "--", "--", "--", "--", _money(1_000_000), "--", "--"])
+        yield b"\n"
+
+
+def write_export(path: str, lines) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.writelines(lines)
+    return path
+
+
+def write_fidelity_export(path: str, n_rows: int, seed: int = 0) -> str:
+    return write_export(path, fidelity_export_lines(n_rows, seed))
+
+
+def write_schwab_export(path: str, n_rows: int, seed: int = 0) -> str:
+    return write_export(path, schwab_export_lines(n_rows, seed))
@@ -0,0 +1,424 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import reduce
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from cache import ParseCache, file_digest
+from money import format_cents, parse_cents
+from profiling import stage
+from readers import read_fidelity_positions, read_schwab_positions
+
+# Columns of the normalized long-format positions table every broker is loaded into.
+# Current Value holds int64 cents throughout grouping and merging; it becomes dollars only when formatted.
+POSITION_COLUMNS = [
+    "Source", "Source File", "Account Number", "Account Name", "Symbol", "Description", "Current Value", "Group",
+]
+# Label columns repeat the same few values on every row, so they are stored as categoricals
+CATEGORICAL_COLUMNS = [column for column in POSITION_COLUMNS if column != "Current Value"]
+
+# Holdings below this percentage of the total are left out of the grouped reports
+MIN_PERCENTAGE = 0.005
+
+# Formatters shared by the printed tables and the CSV outputs
+VALUE_FORMAT = format_cents
+PERCENT_FORMAT = "{:.2f}%".format
+
+
+@dataclass(frozen=True)
+class BrokerAdapter:
+    # Short name: input is read from data/data_<name>, output written to data/grouped_<name>.csv
+    name: str
+    # Name used in printed reports
+    label: str
+    # Parses one raw export into a DataFrame with Account Name, Symbol, Description and Current Value
+    reader: Callable[[str], pd.DataFrame]
+    # Symbols counted as cash; they are grouped together as "Cash"
+    cash_symbols: tuple[str, ...]
+    # Account numbers left out of the report
+    excluded_accounts: tuple[str, ...] = ()
+    # Treasury ETFs, looked up per account by AccountIndex.treasury
+    treasury_symbols: tuple[str, ...] = ()
+
+    @property
+    def data_dir(self) -> str:
+        return f"data/data_{self.name}"
+
+    @property
+    def output_path(self) -> str:
+        return f"data/grouped_{self.name}.csv"
+
+
+BROKERS: dict[str, BrokerAdapter] = {}
+
+# Allocation merged across all brokers
+MERGED_OUTPUT_PATH = "data/grouped_merged.csv"
+
+
+def register_broker(adapter: BrokerAdapter) -> BrokerAdapter:
+    if adapter.name in BROKERS:
+        raise ValueError(f"Broker {adapter.name!r} is already registered.")
+    BROKERS[adapter.name] = adapter
+    return adapter
+
+
+FIDELITY_CASH_SYMBOLS = ("SPAXX**", "FDRXX**", "CORE**", "USD***", "Pending Activity", "Pending activity")
+
+register_broker(BrokerAdapter(
+    name="fidelity",
+    label="Fidelity",
+    reader=read_fidelity_positions,
+    cash_symbols=FIDELITY_CASH_SYMBOLS,
+    # 32213: Geospace Technologies, X77788987: Cash Management
+    excluded_accounts=("32213", "X77788987"),
+))
+
+register_broker(BrokerAdapter(
+    name="fidelity_simon",
+    label="Fidelity Simon",
+    reader=read_fidelity_positions,
+    cash_symbols=FIDELITY_CASH_SYMBOLS,
+    excluded_accounts=("84479", "X77788987"),
+))
+
+register_broker(BrokerAdapter(
+    name="charles",
+    label="Charles",
+    reader=read_schwab_positions,
+    cash_symbols=("SGVT", "SGOV", "Cash & Cash Investments"),
+    treasury_symbols=("SGVT", "SGOV"),
+))
+
+
+def find_exports(adapter: BrokerAdapter) -> list[str]:
+    # All CSV files in the broker's data directory, sorted by name
+    data_dir = adapter.data_dir
+    files = [f for f in os.listdir(data_dir) if os.path.isfile(os.path.join(data_dir, f)) and f.lower().endswith(".csv")]
+    return [os.path.join(data_dir, f) for f in sorted(files)]
+
+
+# Dates in export file names: 2026-10-17 (Schwab) or Oct-18-2026 (Fidelity)
+_ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_MONTH_DATE = re.compile(r"([A-Z][a-z]{2})-(\d{1,2})-(\d{4})")
+
+
+def snapshot_date(path: str) -> pd.Timestamp:
+    # Take the date from the file name when there is one, else the file's modification date
+    name = os.path.basename(path)
+    try:
+        if m := _ISO_DATE.search(name):
+            return pd.Timestamp(datetime(int(m[1]), int(m[2]), int(m[3])))
+        if m := _MONTH_DATE.search(name):
+            return pd.Timestamp(datetime.strptime(f"{m[1]}-{m[2]}-{m[3]}", "%b-%d-%Y"))
+    except ValueError:
+        pass
+    return pd.Timestamp(os.path.getmtime(path), unit="s").normalize()
+
+
+def unique_exports(adapter: BrokerAdapter, cache: ParseCache | None = None) -> list[str]:
+    # The broker's exports, oldest first (by snapshot date, then mtime), keeping only the
+    # newest file of any set with identical content. With a cache, unchanged files are
+    # matched by their stat sidecar instead of being hashed again.
+    files = sorted(find_exports(adapter), key=lambda path: (snapshot_date(path), os.path.getmtime(path), path))
+    by_digest = {}
+    for path in reversed(files):
+        digest = file_digest(path) if cache is None else cache.digest(cache_namespace(adapter), path)
+        by_digest.setdefault(digest, path)
+    return list(reversed(by_digest.values()))
+
+
+def current_exports(adapter: BrokerAdapter, cache: ParseCache | None = None) -> list[str]:
+    # The unique exports of the newest snapshot date, oldest first. Older days only hold
+    # what the broker held then: an account missing from today's exports is closed or
+    # was moved, and counting it from an older file would count its money twice.
+    file_paths = unique_exports(adapter, cache)
+    if not file_paths:
+        return []
+    newest = snapshot_date(file_paths[-1])
+    return [path for path in file_paths if snapshot_date(path) == newest]
+
+
+def tag_cash(symbol: pd.Series, cash_symbols: Iterable[str]) -> pd.Series:
+    # 'Cash' for cash symbols, else the original symbol. Works on the categories
+    # rather than the rows: cash categories are relabelled and the codes remapped.
+    categories = symbol.cat.categories
+    labels = categories.where(~categories.isin(list(cash_symbols)), "Cash")
+    group_categories = labels.unique()
+    # The extra -1 at the end is where missing symbols (code -1) land, even with no categories at all
+    code_map = np.append(group_categories.get_indexer(labels), -1)
+    group_codes = code_map[symbol.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(group_codes, group_categories), index=symbol.index, name="Group")
+
+
+def normalize_positions(adapter: BrokerAdapter, df: pd.DataFrame, file_path: str) -> pd.DataFrame:
+    with stage("clean", source=adapter.name):
+        if adapter.excluded_accounts and "Account Number" in df.columns:
+            df = df[~df["Account Number"].isin(adapter.excluded_accounts)]
+
+        positions = df.reindex(columns=POSITION_COLUMNS[2:-1])
+        positions.insert(0, "Source", adapter.name)
+        positions.insert(1, "Source File", file_path)
+        positions["Current Value"] = parse_cents(positions["Current Value"])
+        positions = positions.astype({column: "category" for column in CATEGORICAL_COLUMNS[:-1]})
+    with stage("tag_cash", source=adapter.name):
+        positions["Group"] = tag_cash(positions["Symbol"], adapter.cash_symbols)
+    return positions
+
+
+def concat_positions(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # Give every frame the same categories first, otherwise concat falls back to object columns
+    dtypes = {
+        column: pd.CategoricalDtype(reduce(pd.Index.union, [frame[column].cat.categories for frame in frames]))
+        for column in CATEGORICAL_COLUMNS
+    }
+    return pd.concat([frame.astype(dtypes) for frame in frames], ignore_index=True)
+
+
+def cache_namespace(adapter: BrokerAdapter) -> str:
+    # Everything that changes the normalized frame of a given export
+    return repr((
+        adapter.name, adapter.reader.__module__, adapter.reader.__qualname__,
+        adapter.cash_symbols, adapter.excluded_accounts,
+    ))
+
+
+def _read(adapter: BrokerAdapter, file_path: str) -> pd.DataFrame:
+    with stage("read", source=adapter.name, file=file_path):
+        return adapter.reader(file_path)
+
+
+def load_positions(adapter: BrokerAdapter, file_path: str, cache: ParseCache | None = None) -> pd.DataFrame:
+    if cache is None or not cache.enabled:
+        return normalize_positions(adapter, _read(adapter, file_path), file_path)
+
+    with stage("cache_load", source=adapter.name):
+        entry_key = cache.entry_key(cache_namespace(adapter), file_path)
+        positions = cache.load(entry_key)
+    if positions is None:
+        positions = normalize_positions(adapter, _read(adapter, file_path), file_path)
+        with stage("cache_store", source=adapter.name):
+            cache.store(entry_key, positions)
+    else:
+        # The same content may have been cached under another file name
+        positions["Source File"] = pd.Series(file_path, index=positions.index, dtype="category")
+    return positions
+
+
+def keep_newest_accounts(positions: pd.DataFrame, order: np.ndarray, keys: Iterable[str] = ()) -> pd.DataFrame:
+    # positions stacks several exports, order numbers the export of every row (higher is
+    # newer). Within each group of keys, every account is taken from the newest export
+    # that contains it.
+    order = pd.Series(order, index=positions.index)
+    by = [positions[key] for key in (*keys, "Account Number", "Account Name")]
+    newest = order.groupby(by, observed=True, dropna=False).transform("max")
+    return positions[(order == newest).to_numpy()].reset_index(drop=True)
+
+
+def latest_by_account(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # frames are one broker's exports of one day, oldest first. Exports of different
+    # accounts add up, while a later export of the same account supersedes an earlier one.
+    if len(frames) == 1:
+        return frames[0]
+    return keep_newest_accounts(concat_positions(frames), np.repeat(np.arange(len(frames)), [len(frame) for frame in frames]))
+
+
+def load_source(adapter: BrokerAdapter, cache: ParseCache | None = None, workers: int = 1) -> pd.DataFrame:
+    # The broker's current exports, read concurrently by up to workers threads
+    file_paths = current_exports(adapter, cache)
+    if not file_paths:
+        raise FileNotFoundError(f"No files found in {adapter.data_dir}.")
+    if workers > 1 and len(file_paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+            frames = list(executor.map(lambda path: load_positions(adapter, path, cache), file_paths))
+    else:
+        frames = [load_positions(adapter, path, cache) for path in file_paths]
+    return latest_by_account(frames)
+
+
+def _timed_load(
+    adapter: BrokerAdapter,
+    file_path: str,
+    cache: ParseCache | None = None,
+    profile: tuple[bool, int] | None = None,
+) -> tuple[pd.DataFrame, float, list[dict]]:
+    # In a worker process, profile carries the parent's (trace_memory, origin_ns) so the
+    # worker records its own stages and hands them back with the result
+    profiler = profiling.enable(*profile) if profile is not None else None
+    start = time.perf_counter()
+    with stage("load", source=adapter.name):
+        positions = load_positions(adapter, file_path, cache)
+    seconds = time.perf_counter() - start
+    return positions, seconds, profiler.events if profiler is not None else []
+
+
+def load_all_positions(
+    adapters: Iterable[BrokerAdapter] | None = None,
+    workers: int = 1,
+    use_threads: bool = False,
+    timings: dict[str, float] | None = None,
+    cache: ParseCache | None = None,
+) -> pd.DataFrame:
+    # Every current export of every broker is parsed independently, so with workers > 1
+    # the files are loaded in parallel processes (or threads, with use_threads), which
+    # also overlaps their reads. Seconds spent per source are stored in timings when
+    # given. With a cache, unchanged exports are read back from it instead of being
+    # parsed again.
+    adapters = list(BROKERS.values() if adapters is None else adapters)
+    jobs = []
+    for adapter in adapters:
+        file_paths = current_exports(adapter, cache)
+        if not file_paths:
+            raise FileNotFoundError(f"No files found in {adapter.data_dir}.")
+        jobs.extend((adapter, file_path) for file_path in file_paths)
+    job_adapters = [adapter for adapter, _ in jobs]
+    job_paths = [file_path for _, file_path in jobs]
+
+    profiler = profiling.active()
+    if workers > 1 and len(jobs) > 1 and use_threads:
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(_timed_load, job_adapters, job_paths, [cache] * len(jobs)))
+    elif workers > 1 and len(jobs) > 1:
+        profile = None if profiler is None else (profiler.trace_memory, profiler.origin_ns)
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(
+                _timed_load, job_adapters, job_paths, [cache] * len(jobs), [profile] * len(jobs),
+            ))
+        if profiler is not None:
+            for _, _, events in results:
+                profiler.add_events(events)
+    else:
+        results = [_timed_load(adapter, file_path, cache) for adapter, file_path in jobs]
+
+    frames = {adapter.name: [] for adapter in adapters}
+    seconds_by_source = dict.fromkeys(frames, 0.0)
+    for adapter, (positions, seconds, _) in zip(job_adapters, results):
+        frames[adapter.name].append(positions)
+        seconds_by_source[adapter.name] += seconds
+    if timings is not None:
+        timings.update(seconds_by_source)
+    with stage("concat"):
+        return concat_positions([latest_by_account(source_frames) for source_frames in frames.values()])
+
+
+def group_positions(positions: pd.DataFrame, keys: Iterable[str] = ()) -> pd.DataFrame:
+    # Group by 'Group', sum 'Current Value' and carry the symbol's description along.
+    # With keys (the Source and Date of stacked snapshots), every combination of keys is
+    # grouped on its own, in the same pass; they lead the columns and the sort order.
+    keys = list(keys)
+    grouped = (
+        positions.groupby([*keys, "Group"], observed=True, sort=False)
+        .agg(**{"Current Value": ("Current Value", "sum"), "Description": ("Description", "last")})
+        .reset_index()
+        .sort_values([*keys, "Current Value"], ascending=[True] * len(keys) + [False], kind="stable")
+    )
+    if keys:
+        totals = positions.groupby(keys, observed=True)["Current Value"].sum().rename("Total").reset_index()
+        total_current_value = grouped[keys].merge(totals, on=keys, how="left")["Total"].to_numpy()
+    else:
+        total_current_value = positions["Current Value"].sum()
+    grouped["Percentage of Total"] = (grouped["Current Value"] / total_current_value) * 100
+
+    # The grouped table is small: plain labels keep merging and formatting simple
+    for column in [*keys, "Group"]:
+        if isinstance(grouped[column].dtype, pd.CategoricalDtype):
+            grouped[column] = grouped[column].astype(object)
+    # Description: blank for 'Cash'
+    grouped["Description"] = grouped["Description"].astype(object).where(grouped["Group"] != "Cash", "")
+
+    grouped = grouped[[*keys, "Group", "Description", "Current Value", "Percentage of Total"]]
+    return grouped[grouped["Percentage of Total"] >= MIN_PERCENTAGE]
+
+
+class AccountIndex:
+    """Per-account aggregates of one source's positions, built once per load.
+
+    A single groupby over (Account Name, Symbol, Group) collapses the rows to one value
+    per account and symbol; those are kept in dictionaries along with per-account
+    totals, so the cash, treasury ETF or single holding of any account is a dictionary
+    lookup instead of a mask over the whole frame.
+    """
+
+    def __init__(self, adapter: BrokerAdapter, positions: pd.DataFrame):
+        values = positions.groupby(["Account Name", "Symbol", "Group"], observed=True, sort=False)["Current Value"].sum()
+        treasury_symbols = set(adapter.treasury_symbols)
+        self._symbols: dict[str, dict[str, int]] = {}
+        self._cash_symbols: dict[str, dict[str, int]] = {}
+        self._totals: dict[str, dict[str, int]] = {}
+        for (account, symbol, group), value in values.items():
+            value = int(value)
+            self._symbols.setdefault(account, {})[symbol] = value
+            cash_symbols = self._cash_symbols.setdefault(account, {})
+            totals = self._totals.setdefault(account, {"total": 0, "cash": 0, "treasury": 0})
+            totals["total"] += value
+            if group == "Cash":
+                cash_symbols[symbol] = value
+                totals["cash"] += value
+            if symbol in treasury_symbols:
+                totals["treasury"] += value
+
+    @property
+    def accounts(self) -> list[str]:
+        # In order of first appearance in the export
+        return list(self._symbols)
+
+    # All amounts are in cents
+
+    def total(self, account: str) -> int:
+        return self._totals.get(account, {}).get("total", 0)
+
+    def cash(self, account: str) -> int:
+        return self._totals.get(account, {}).get("cash", 0)
+
+    def cash_by_symbol(self, account: str) -> dict[str, int]:
+        return self._cash_symbols.get(account, {})
+
+    def treasury(self, account: str) -> int:
+        return self._totals.get(account, {}).get("treasury", 0)
+
+    def value(self, account: str, symbol: str) -> int:
+        # Current value of one holding; 0 when the account does not hold it
+        return self._symbols.get(account, {}).get(symbol, 0)
+
+
+def merge_stacked(stacked: pd.DataFrame, keys: Iterable[str] = ()) -> pd.DataFrame:
+    # Aggregate grouped tables stacked in source order once per 'Group': values are summed
+    # (a source without the group adds nothing) and the description comes from the first
+    # source that has one. With keys (the Date of stacked snapshots), every combination of
+    # keys is merged on its own, in the same pass.
+    keys = list(keys)
+    merged = (
+        stacked.groupby([*keys, "Group"], sort=False)
+        .agg(**{"Description": ("Description", "first"), "Total Current Value": ("Current Value", "sum")})
+        .reset_index()
+    )
+
+    # Recalculate Percentage of Total
+    if keys:
+        total_merged = merged.groupby(keys, sort=False)["Total Current Value"].transform("sum")
+    else:
+        total_merged = merged["Total Current Value"].sum()
+    merged["Percentage of Total"] = (merged["Total Current Value"] / total_merged) * 100
+    merged = merged.sort_values([*keys, "Percentage of Total"], ascending=[True] * len(keys) + [False], kind="stable")
+    return merged[merged["Percentage of Total"] >= MIN_PERCENTAGE]
+
+
+def merge_grouped(grouped_by_source: dict[str, pd.DataFrame]) -> tuple[pd.DataFrame, int]:
+    # Stack the grouped tables of all sources, in the order of grouped_by_source, and merge them
+    stacked = pd.concat(
+        [grouped[["Group", "Description", "Current Value"]] for grouped in grouped_by_source.values()],
+        ignore_index=True,
+    )
+    return merge_stacked(stacked), int(stacked["Current Value"].sum())
+
+
+def to_report_string(grouped: pd.DataFrame) -> str:
+    formatters = {column: VALUE_FORMAT for column in grouped.columns if column.endswith("Current Value")}
+    formatters["Percentage of Total"] = PERCENT_FORMAT
+    return grouped.to_string(index=False, formatters=formatters)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Bump when the cleaned frames change shape, so old entries are never read back
+CACHE_VERSION = 4
+
+DEFAULT_CACHE_DIR = "data/.cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _key(*parts: str) -> str:
+    return hashlib.blake2b("\0".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_json(path: str, data: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def write_atomic(path: str, write) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ParseCache:
+    """On-disk cache of cleaned broker frames, stored as uncompressed Feather files.
+
+    Entries are keyed by a namespace (which parser and settings produced the frame)
+    and the content hash of the raw export. A small sidecar per export path remembers
+    the file's size, mtime and hash, so an unchanged file is matched from os.stat()
+    alone and only re-hashed when it was touched. Entries are read back memory-mapped
+    and evicted least-recently-used first once the cache grows past max_bytes; the
+    sidecars of exports that no longer exist are removed at the same time. Several
+    processes may share the cache, so any file can vanish while it is being used.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        # Needs pyarrow for Feather
+        return feather is not None
+
+    def _stat_path(self, namespace: str, path: str) -> str:
+        return os.path.join(self.cache_dir, f"{_key(namespace, os.path.abspath(path))}.json")
+
+    def _entry_path(self, entry_key: str) -> str:
+        return os.path.join(self.cache_dir, f"{entry_key}.feather")
+
+    def digest(self, namespace: str, path: str) -> str:
+        # Content hash of the file, re-hashed only when its size or mtime changed
+        stat = os.stat(path)
+        stat_path = self._stat_path(namespace, path)
+        try:
+            with open(stat_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns:
+            digest = meta["digest"]
+        else:
+            digest = file_digest(path)
+            meta = {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_atomic(stat_path, lambda tmp: write_json(tmp, meta))
+        return digest
+
+    def entry_key(self, namespace: str, path: str) -> str:
+        return _key(str(CACHE_VERSION), namespace, self.digest(namespace, path))
+
+    def load(self, entry_key: str) -> pd.DataFrame | None:
+        entry_path = self._entry_path(entry_key)
+        try:
+            table = feather.read_table(entry_path, memory_map=True)
+        except (OSError, ValueError):
+            return None
+        # Mark as recently used for LRU eviction. Another process may have evicted the entry
+        # since it was opened; the memory-mapped table stays readable.
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        return table.to_pandas()
+
+    def store(self, entry_key: str, df: pd.DataFrame) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            write_atomic(
+                self._entry_path(entry_key),
+                lambda tmp: df.reset_index(drop=True).to_feather(tmp, compression="uncompressed"),
+            )
+        except (TypeError, ValueError):
+            # Columns Arrow cannot represent (e.g. mixed object types): just don't cache
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        sidecars = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".feather"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Evicted by another process meanwhile
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                elif entry.name.endswith(".json"):
+                    sidecars.append(entry.path)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+        self._prune_sidecars(sidecars)
+
+    @staticmethod
+    def _prune_sidecars(paths: list[str]) -> None:
+        # Exports are rotated out of the data directories, and their stat sidecars would
+        # otherwise pile up forever: drop the ones whose export is gone
+        for path in paths:
+            try:
+                with open(path) as f:
+                    export_path = json.load(f).get("path")
+            except (OSError, ValueError):
+                continue
+            if export_path and not os.path.exists(export_path):
+                _remove(path)
@@ -0,0 +1,170 @@
+"""Writers for the grouped report tables.
+
+The CSVs are for people: amounts formatted like "$1,234.56" and percentages like
+"12.34%", produced column-wise with NumPy integer arithmetic instead of a Python
+format call per cell. Parquet and Arrow IPC (Feather) files are for programs:
+amounts as decimal128(18, 2) built directly from the int64 cents, percentages as
+float64, so nothing has to be parsed back. write_outputs writes every table in
+every requested format in one step, each file atomically.
+"""
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cache import write_atomic
+from profiling import stage
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# File suffix of each output format
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _fixed_point_text(hundredths: np.ndarray, negative: np.ndarray, thousands: bool, prefix: bytes, suffix: bytes) -> np.ndarray:
+    # Renders non-negative integers counted in hundredths as "<prefix>[-]1,234.56<suffix>".
+    # The text is laid out right-aligned in an (n, width) byte matrix, one column per
+    # character, filled with integer arithmetic a digit position at a time, then viewed
+    # as fixed-width byte strings; only the leading padding is stripped per cell.
+    n = len(hundredths)
+    whole = hundredths // 100
+    int_digits = len(str(int(whole.max()))) if n else 1
+    n_commas = (int_digits - 1) // 3 if thousands else 0
+    width = len(prefix) + 1 + int_digits + n_commas + 3 + len(suffix)
+    out = np.full((n, width), ord(" "), dtype=np.uint8)
+
+    end = width - len(suffix)
+    for i, char in enumerate(suffix):
+        out[:, end + i] = char
+    out[:, end - 1] = hundredths % 10 + ord("0")
+    out[:, end - 2] = hundredths // 10 % 10 + ord("0")
+    out[:, end - 3] = ord(".")
+
+    row_digits = 1 + np.searchsorted(10 ** np.arange(1, int_digits, dtype=np.int64), whole, side="right")
+    column = end - 4
+    rest = whole.copy()
+    for k in range(int_digits):
+        if thousands and k and k % 3 == 0:
+            out[:, column] = np.where(row_digits > k, ord(","), ord(" "))
+            column -= 1
+        out[:, column] = np.where(row_digits > k, rest % 10 + ord("0"), ord(" "))
+        rest //= 10
+        column -= 1
+
+    # Sign and prefix go right before each row's first digit
+    first = end - 3 - row_digits - ((row_digits - 1) // 3 if thousands else 0)
+    rows = np.arange(n)
+    out[rows[negative], first[negative] - 1] = ord("-")
+    start = first - negative - len(prefix)
+    for i, char in enumerate(prefix):
+        out[rows, start + i] = char
+    return np.char.lstrip(out.view(f"S{width}").ravel()).astype(str)
+
+
+def format_cents_array(cents) -> np.ndarray:
+    # Vectorized money.format_cents: "$1,234.56", negative amounts as "$-1,234.56"
+    cents = np.asarray(cents, dtype="int64")
+    return _fixed_point_text(np.abs(cents), cents < 0, True, b"$", b"")
+
+
+def format_percent_array(values) -> np.ndarray:
+    # Vectorized "{:.2f}%". Values whose hundredths land within rounding error of a tie
+    # are formatted one by one, so the output matches str.format exactly.
+    values = np.asarray(values, dtype="float64")
+    finite = np.isfinite(values)
+    scaled = np.where(finite, np.abs(values) * 100, 0.0)
+    text = _fixed_point_text(np.rint(scaled).astype("int64"), np.signbit(values), False, b"", b"%")
+    exceptions = np.flatnonzero((np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) | ~finite)
+    if len(exceptions):
+        text = text.astype(object)
+        for i in exceptions:
+            text[i] = f"{values[i]:.2f}%"
+        text = text.astype(str)
+    return text
+
+
+def format_table(table: pd.DataFrame) -> pd.DataFrame:
+    # Amount columns (ending in "Current Value", int64 cents) and "Percentage of Total" as display strings
+    formatted = table.copy()
+    for column in formatted.columns:
+        if column.endswith("Current Value"):
+            formatted[column] = format_cents_array(formatted[column].to_numpy())
+    formatted["Percentage of Total"] = format_percent_array(formatted["Percentage of Total"].to_numpy())
+    return formatted
+
+
+def _cents_to_decimal(cents: np.ndarray) -> "pa.Array":
+    # decimal128 stores the unscaled value as a 128-bit little-endian integer: the cents
+    # themselves, sign-extended, so the amounts are exact without any arithmetic
+    words = np.empty((len(cents), 2), dtype="<i8")
+    words[:, 0] = cents
+    words[:, 1] = cents >> 63
+    return pa.Array.from_buffers(pa.decimal128(18, 2), len(cents), [None, pa.py_buffer(words)])
+
+
+def to_arrow(table: pd.DataFrame) -> "pa.Table":
+    columns = {}
+    for column in table.columns:
+        values = table[column]
+        if column.endswith("Current Value"):
+            columns[column] = _cents_to_decimal(values.to_numpy(dtype="int64"))
+        elif column == "Percentage of Total":
+            columns[column] = pa.array(values.to_numpy(dtype="float64"))
+        else:
+            columns[column] = pa.array(values.astype(object), type=pa.string(), from_pandas=True)
+    return pa.table(columns)
+
+
+def write_csv(table: pd.DataFrame, path: str) -> None:
+    # Same bytes as format_table(table).to_csv(path, index=False): every column is text by
+    # now, so the rows go straight to csv.writer (minimal quoting, missing values empty)
+    formatted = format_table(table).fillna("")
+    columns = [formatted[column].tolist() for column in formatted.columns]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(formatted.columns)
+        writer.writerows(zip(*columns))
+
+
+def _write(table: pd.DataFrame, path: str, output_format: str) -> str:
+    # Every file is its own profiling stage, inside the caller's stage for the whole batch
+    with stage("write", file=path, format=output_format):
+        if output_format == "csv":
+            write_atomic(path, lambda tmp: write_csv(table, tmp))
+        elif output_format == "parquet":
+            write_atomic(path, lambda tmp: pq.write_table(to_arrow(table), tmp))
+        else:
+            write_atomic(path, lambda tmp: feather.write_feather(to_arrow(table), tmp))
+    return path
+
+
+def write_outputs(
+    tables: dict[str, pd.DataFrame],
+    formats: tuple[str, ...] = ("csv",),
+    workers: int = 1,
+) -> list[str]:
+    # tables maps each CSV output path to its table; the other formats are written next to
+    # it with their own suffix. With workers > 1 the files are written by a thread pool.
+    # Returns the paths written.
+    unknown = set(formats) - set(OUTPUT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown output format(s) {sorted(unknown)}, expected some of {list(OUTPUT_FORMATS)}.")
+    if pa is None and set(formats) - {"csv"}:
+        raise ImportError("Parquet and Arrow outputs need pyarrow: pip install 'portfolio[cache]'")
+
+    jobs = [
+        (table, os.path.splitext(path)[0] + OUTPUT_FORMATS[output_format], output_format)
+        for path, table in tables.items()
+        for output_format in formats
+    ]
+    if workers > 1 and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            return list(executor.map(lambda job: _write(*job), jobs))
+    return [_write(*job) for job in jobs]
@@ -0,0 +1,106 @@
+"""Per-stage timing and memory instrumentation for the report pipeline.
+
+Pipeline code wraps its stages in ``with stage("name", source=...):``. Until
+enable() is called that returns a shared no-op context manager, so disabled
+profiling costs one function call per stage. Once enabled, every stage becomes a
+complete ("X") event in Chrome trace format, which write() saves as JSON for
+chrome://tracing or Perfetto, along with a per-stage summary. With
+trace_memory=True each event recorded on a process's main thread also carries
+the tracemalloc peak reached while the stage ran. The peak is process-wide and
+has to be reset per stage, so stages in worker threads (--threads, concurrent
+output writes) are timed only: they would reset each other's peaks.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+PROFILE_ENV = "PORTFOLIO_PROFILE"
+PROFILE_MEMORY_ENV = "PORTFOLIO_PROFILE_MEMORY"
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class Profiler:
+    def __init__(self, trace_memory: bool = False, origin_ns: int | None = None):
+        self.trace_memory = trace_memory
+        self.events: list[dict] = []
+        # Worker processes are given their parent's origin so all events share one timeline
+        self.origin_ns = time.perf_counter_ns() if origin_ns is None else origin_ns
+        self._lock = threading.Lock()
+        # Peaks of the enclosing main-thread stages, so resetting the peak for a nested stage loses nothing
+        self._peak_stack: list[int] = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **args):
+        trace_memory = self.trace_memory and threading.current_thread() is threading.main_thread()
+        if trace_memory:
+            peak_stack = self._peak_stack
+            peak_stack.append(0)
+            tracemalloc.reset_peak()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            if trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], peak_stack.pop())
+                if peak_stack:
+                    peak_stack[-1] = max(peak_stack[-1], peak)
+                tracemalloc.reset_peak()
+                args["tracemalloc_peak_mb"] = round(peak / 2**20, 3)
+            event = {
+                "name": name, "cat": "pipeline", "ph": "X",
+                "ts": (start - self.origin_ns) / 1000, "dur": (end - start) / 1000,
+                "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def add_events(self, events: list[dict]) -> None:
+        # Events recorded by a worker process
+        with self._lock:
+            self.events.extend(events)
+
+    def summary(self) -> list[dict]:
+        stages = {}
+        for event in self.events:
+            key = (event["name"], event["args"].get("source"))
+            s = stages.setdefault(key, {"stage": key[0], "source": key[1], "count": 0, "total_ms": 0.0})
+            s["count"] += 1
+            s["total_ms"] += event["dur"] / 1000
+            if "tracemalloc_peak_mb" in event["args"]:
+                s["tracemalloc_peak_mb"] = max(s.get("tracemalloc_peak_mb", 0), event["args"]["tracemalloc_peak_mb"])
+        return sorted(stages.values(), key=lambda s: -s["total_ms"])
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms", "summary": self.summary()}, f, indent=1)
+
+
+_active: Profiler | None = None
+
+
+def enable(trace_memory: bool = False, origin_ns: int | None = None) -> Profiler:
+    global _active
+    _active = Profiler(trace_memory, origin_ns)
+    return _active
+
+
+def disable() -> None:
+    global _active
+    _active = None
+
+
+def active() -> Profiler | None:
+    return _active
+
+
+def stage(name: str, **args):
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, **args)
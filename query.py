@@ -0,0 +1,134 @@
+"""Quick answers from the report summary: total, cash, groups and merged.
+
+These subcommands only import the standard library. They answer from
+data/summary.json (see summary.py) when it is current. Otherwise the exports are
+loaded once, through the parse cache, which imports pandas and rewrites the grouped
+outputs and the summary; the answer then comes from the fresh summary.
+"""
+import argparse
+import json
+import sys
+
+from summary import load_summary
+
+COMMANDS = ("total", "cash", "groups", "merged")
+
+
+def _money(cents: int) -> str:
+    # Same text as money.format_cents, which would pull in numpy and pandas
+    return f"${cents / 100:,.2f}"
+
+
+def _dollars(cents: int) -> str:
+    # Rounded to whole dollars, like the report's totals
+    return f"${round(cents / 100):,}"
+
+
+def _table(rows: list[list], value_header: str) -> str:
+    # Right-aligned columns, laid out like DataFrame.to_string(index=False)
+    header = ["Group", "Description", value_header, "Percentage of Total"]
+    cells = [header] + [
+        [group, description or "", _money(value), f"{percentage:.2f}%"]
+        for group, description, value, percentage in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    return "\n".join(" ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in cells)
+
+
+def refresh() -> dict | None:
+    # Runs the pipeline without printing the report: the only path that imports pandas.
+    # None when a source could not be loaded (the reason is on stderr), as the report
+    # computes no total without every source either.
+    from cache import ParseCache
+    from watch import PortfolioWatcher
+
+    watcher = PortfolioWatcher(cache=ParseCache())
+    if len(watcher.reload(watcher.adapters)) < len(watcher.adapters):
+        return None
+    return load_summary()
+
+
+def _source(summary: dict, name: str) -> dict:
+    if name not in summary["sources"]:
+        raise SystemExit(f"Unknown source {name!r}, expected one of {sorted(summary['sources'])}.")
+    return summary["sources"][name]
+
+
+def show_total(summary: dict, args: argparse.Namespace) -> None:
+    if args.json:
+        print(json.dumps({"total": summary["total"], "sources": {n: s["total"] for n, s in summary["sources"].items()}}))
+        return
+    print(f"Total Merged Current Value: {_dollars(summary['total'])}")
+    for source in summary["sources"].values():
+        print(f"    {source['label']}: {_dollars(source['total'])}")
+
+
+def show_cash(summary: dict, args: argparse.Namespace) -> None:
+    names = [args.source] if args.source else list(summary["sources"])
+    sources = {name: _source(summary, name) for name in names}
+    if args.json:
+        print(json.dumps({
+            "percentage": summary["cash_percentage"],
+            "sources": {name: {k: source[k] for k in ("cash", "total", "accounts")} for name, source in sources.items()},
+        }))
+        return
+    if not args.source:
+        print(f"Cash as percentage of total: {summary['cash_percentage']:.2f}%")
+    for source in sources.values():
+        percent = f" ({source['cash'] / source['total'] * 100:.2f}%)" if source["total"] else ""
+        print(f"{source['label']}: {_dollars(source['cash'])}{percent}")
+        for account_name, account in source["accounts"].items():
+            print(f'    Sum of cash in "{account_name}": {_money(account["cash"])}')
+            if len(account["cash_symbols"]) > 1:
+                for symbol, value in sorted(account["cash_symbols"].items()):
+                    print(f'        "{symbol}": {_money(value)}')
+
+
+def show_groups(summary: dict, args: argparse.Namespace) -> None:
+    source = _source(summary, args.source)
+    if args.json:
+        print(json.dumps(source["groups"]))
+        return
+    print(f"Current Value by Group as Percentage of Total ({source['label']}):\n")
+    print(_table(source["groups"], "Current Value"))
+
+
+def show_merged(summary: dict, args: argparse.Namespace) -> None:
+    if args.json:
+        print(json.dumps({"total": summary["total"], "groups": summary["merged"]}))
+        return
+    print("Merged Current Value by Group as Percentage of Total:\n")
+    print(_table(summary["merged"], "Total Current Value"))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="main.py", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="print JSON (amounts in cents) instead of text")
+    common.add_argument(
+        "--no-refresh", action="store_true",
+        help="never run the pipeline; exit with status 1 when the summary is missing or out of date",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("total", parents=[common], help="merged and per-broker totals")
+    cash = commands.add_parser("cash", parents=[common], help="cash percentage, per broker and per account")
+    cash.add_argument("--source", help="only this broker (e.g. fidelity, charles)")
+    groups = commands.add_parser("groups", parents=[common], help="allocation by group for one broker")
+    groups.add_argument("source", help="broker name (e.g. fidelity, charles)")
+    commands.add_parser("merged", parents=[common], help="allocation by group across all brokers")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    summary = load_summary()
+    if summary is None:
+        if args.no_refresh:
+            print("The report summary is missing or out of date; run main.py to refresh it.", file=sys.stderr)
+            return 1
+        summary = refresh()
+        if summary is None:
+            print("No report could be computed from the exports in data/.", file=sys.stderr)
+            return 1
+    {"total": show_total, "cash": show_cash, "groups": show_groups, "merged": show_merged}[args.command](summary, args)
+    return 0
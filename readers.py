@@ -0,0 +1,119 @@
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+# A comma sitting right before a line break (Fidelity ends every data row with one)
+_TRAILING_COMMA = re.compile(rb",(?=\r?\n)")
+
+
+class _TrailingCommaStripper(io.RawIOBase):
+    """Byte stream that drops one trailing comma per line while it is being read.
+
+    Only complete lines are rewritten; the partial line at the end of each chunk
+    is carried over to the next read, so a comma split from its line break by a
+    chunk boundary is still removed.
+    """
+
+    def __init__(self, raw, chunk_size: int = 1 << 20):
+        self._raw = raw
+        self._chunk_size = chunk_size
+        self._carry = b""
+        self._pending = b""
+        self._offset = 0
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> None:
+        while self._offset >= len(self._pending) and not self._eof:
+            chunk = self._raw.read(self._chunk_size)
+            self._offset = 0
+            if not chunk:
+                # Last line without a line break
+                self._eof = True
+                tail = self._carry.rstrip(b"\r")
+                if tail.endswith(b","):
+                    tail = tail[:-1]
+                self._pending = tail
+                self._carry = b""
+                return
+            data = self._carry + chunk
+            cut = data.rfind(b"\n") + 1
+            self._carry = data[cut:]
+            self._pending = _TRAILING_COMMA.sub(b"", data[:cut])
+
+    def readinto(self, buffer) -> int:
+        self._fill()
+        n = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:n] = self._pending[self._offset:self._offset + n]
+        self._offset += n
+        return n
+
+
+def read_csv_no_trailing_commas(path: str) -> pd.DataFrame:
+    # Stream the file through the C parser, stripping trailing commas on the fly
+    # instead of building a cleaned copy of the whole export in memory.
+    # low_memory=False infers each column's type from all of its rows, as the python
+    # engine did; chunked inference would turn "32213" into an int in the first chunk
+    # and keep it a str in later ones
+    with open(path, "rb") as raw:
+        stream = io.BufferedReader(_TrailingCommaStripper(raw))
+        df = pd.read_csv(stream, encoding="latin1", skip_blank_lines=True, low_memory=False)
+    df = df.loc[:, ~df.columns.str.contains(r"^Unnamed")]
+    return df
+
+
+def read_fidelity_positions(path: str) -> pd.DataFrame:
+    df_fidelity = read_csv_no_trailing_commas(path)
+    # Remove non-ASCII characters from column names
+    df_fidelity.columns = df_fidelity.columns.str.strip().str.replace(r"[^\x00-\x7F]+", "", regex=True)
+    return df_fidelity
+
+
+def split_schwab_blocks(df_charles: pd.DataFrame) -> pd.DataFrame:
+    # A Schwab positions export is a stack of per-account blocks:
+    #   <account name>
+    #   <empty row>
+    #   Symbol,Description,...        <- block header
+    #   <positions>...
+    # Split them in one pass with a header mask and a forward-filled account label
+    first_col = df_charles.iloc[:, 0]
+    is_header = (first_col.astype(str).str.strip() == "Symbol").to_numpy()
+    header_pos = is_header.nonzero()[0]
+    if len(header_pos) == 0:
+        return pd.DataFrame()
+
+    # Account name is two rows above each header (only a handful of rows, so plain str() is fine)
+    first_values = first_col.to_numpy()
+    account_at_header = [str(first_values[i - 2]).strip() if i > 1 else "" for i in header_pos]
+    block_id = is_header.cumsum()
+    account_name = np.array(account_at_header, dtype=object)[block_id - 1]
+
+    # Skip rows that are entirely empty
+    is_blank = df_charles.isnull().all(axis=1).to_numpy() | (
+        df_charles.apply(lambda col: col.astype(str).str.strip().eq("")).all(axis=1).to_numpy()
+    )
+    keep = (block_id > 0) & ~is_header & ~is_blank
+
+    # All blocks share the same header; use the last one, as the row-by-row parser did
+    header = df_charles.iloc[header_pos[-1]].tolist()
+    df_charles_clean = df_charles.loc[keep].copy()
+    df_charles_clean.columns = header
+    df_charles_clean.insert(0, "Account Name", account_name[keep])
+    df_charles_clean = df_charles_clean.reset_index(drop=True)
+
+    # Rename "Mkt Val (Market Value)" to "Current Value"
+    if "Mkt Val (Market Value)" in df_charles_clean.columns:
+        df_charles_clean = df_charles_clean.rename(columns={"Mkt Val (Market Value)": "Current Value"})
+    # Remove rows where 'Symbol' is one of the distinct account names or "Account Total"
+    account_names = set(df_charles_clean["Account Name"].dropna().unique())
+    df_charles_clean = df_charles_clean[~df_charles_clean["Symbol"].isin(account_names.union({"Account Total"}))]
+    return df_charles_clean
+
+
+def read_schwab_positions(path: str) -> pd.DataFrame:
+    df_charles = pd.read_csv(path, encoding="latin1", skip_blank_lines=True)
+    return split_schwab_blocks(df_charles)
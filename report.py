@@ -0,0 +1,188 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+import profiling
+import server
+from brokers import (
+    BROKERS, MERGED_OUTPUT_PATH, AccountIndex, BrokerAdapter, group_positions, load_all_positions, merge_grouped,
+    to_report_string,
+)
+from cache import DEFAULT_CACHE_DIR, ParseCache
+from exports import OUTPUT_FORMATS, write_outputs
+from money import format_cents
+from profiling import PROFILE_ENV, PROFILE_MEMORY_ENV, stage
+from snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+from summary import build_summary, directory_signature, write_summary
+from watch import PortfolioWatcher
+
+
+def report_cash(adapter: BrokerAdapter, positions: pd.DataFrame, accounts: AccountIndex):
+    total_current_value = positions["Current Value"].sum()
+    print(f"Total {adapter.label} Current Value: ${round(total_current_value / 100):,}\n")
+
+    # Sum the "Current Value" of the cash holdings
+    cash = positions[positions["Group"] == "Cash"]
+    value_cash = cash["Current Value"].sum()
+    print(f"Total Current Value for {list(adapter.cash_symbols)}: ${round(value_cash / 100):,}")
+
+    # Calculate and print the percentage of cash to the total
+    if total_current_value != 0:
+        percent_cash = (value_cash / total_current_value) * 100
+        print(f"Cash as percentage of total: {percent_cash:.2f}%\n")
+    else:
+        print("Total current value is zero, cannot compute percentage.\n")
+
+    # Cash held in each account, itemized when an account holds more than one cash symbol
+    for account_name in accounts.accounts:
+        print(f'Sum of cash in "{account_name}": {format_cents(accounts.cash(account_name))}')
+        by_symbol = accounts.cash_by_symbol(account_name)
+        if len(by_symbol) > 1:
+            for symbol, value in sorted(by_symbol.items()):
+                print(f'    "{symbol}": {format_cents(value)}')
+    if accounts.accounts:
+        print("")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Consolidated portfolio report across brokers.",
+        epilog="Quick queries that skip the report: main.py {total,cash,groups,merged} (see main.py total --help).",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="load the broker exports and write the outputs concurrently with this many workers "
+        "and print per-source load times",
+    )
+    parser.add_argument("--threads", action="store_true", help="use a thread pool instead of a process pool")
+    parser.add_argument(
+        "--formats", nargs="+", choices=list(OUTPUT_FORMATS), default=["csv"],
+        help="output files to write for every grouped table (default: csv); parquet and arrow need pyarrow",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="always parse the raw exports, bypassing the parse cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"parse cache location (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument(
+        "--snapshot", action="store_true",
+        help="record every export in the data directories into the daily snapshot store",
+    )
+    parser.add_argument(
+        "--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR, help=f"snapshot store location (default: {DEFAULT_SNAPSHOT_DIR})",
+    )
+    parser.add_argument(
+        "--profile", metavar="PATH", default=os.environ.get(PROFILE_ENV),
+        help=f"write per-stage timings as a Chrome trace JSON file (or set {PROFILE_ENV})",
+    )
+    parser.add_argument(
+        "--profile-memory", action="store_true", default=bool(os.environ.get(PROFILE_MEMORY_ENV)),
+        help=f"also record tracemalloc peaks per stage (or set {PROFILE_MEMORY_ENV}=1)",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="after the report, keep running and rewrite the grouped CSVs whenever an export changes",
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=0.25, metavar="SECONDS",
+        help="how often --watch polls the data directories (default: 0.25)",
+    )
+    parser.add_argument(
+        "--serve", type=int, nargs="?", const=server.DEFAULT_PORT, default=None, metavar="PORT",
+        help=f"after the report, serve the holdings as JSON over HTTP (default port: {server.DEFAULT_PORT}); "
+        "combine with --watch to pick up new exports",
+    )
+    parser.add_argument("--host", default=server.DEFAULT_HOST, help=f"address for --serve (default: {server.DEFAULT_HOST})")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.profile:
+        profiling.enable(trace_memory=args.profile_memory)
+    print("Hello from portfolio!\n")
+
+    cache = None if args.no_cache else ParseCache(args.cache_dir)
+    # Taken before loading, so an export written meanwhile makes the summary stale rather than wrong
+    inputs = {adapter.data_dir: directory_signature(adapter.data_dir) for adapter in BROKERS.values()}
+    timings = {}
+    start = time.perf_counter()
+    try:
+        positions = load_all_positions(
+            workers=args.workers or 1,
+            use_threads=args.threads,
+            timings=timings,
+            cache=cache,
+        )
+    except FileNotFoundError as e:
+        print(e)
+        return
+    load_seconds = time.perf_counter() - start
+
+    positions_by_source = {}
+    accounts_by_source = {}
+    grouped_by_source = {}
+    for name, source_positions in positions.groupby("Source", observed=True, sort=False):
+        adapter = BROKERS[name]
+        for file_path in source_positions["Source File"].unique():
+            print(f"Load data from {file_path}\n")
+        positions_by_source[name] = source_positions
+        accounts_by_source[name] = AccountIndex(adapter, source_positions)
+        report_cash(adapter, source_positions, accounts_by_source[name])
+
+        with stage("group", source=name):
+            grouped = group_positions(source_positions)
+        grouped_by_source[name] = grouped
+
+        print(f"Current Value by Group as Percentage of Total ({adapter.label}):\n")
+        print(to_report_string(grouped))
+        print("")
+
+    with stage("merge"):
+        merged, total_merged = merge_grouped(grouped_by_source)
+
+    # Save every grouped table in one batch
+    outputs = {BROKERS[name].output_path: grouped for name, grouped in grouped_by_source.items()}
+    outputs[MERGED_OUTPUT_PATH] = merged
+    with stage("write_outputs", formats=args.formats):
+        write_outputs(outputs, formats=tuple(args.formats), workers=args.workers or 1)
+        write_summary(build_summary(
+            list(BROKERS.values()), inputs, positions_by_source, accounts_by_source, grouped_by_source,
+            merged, total_merged,
+        ))
+
+    print(f"Total Merged Current Value: ${round(total_merged / 100):,}")
+    # Calculate and print cash as percentage of total for merged
+    cash_row = merged[merged["Group"] == "Cash"]
+    if not cash_row.empty:
+        cash_percent = cash_row["Percentage of Total"].values[0]
+        print(f"\nCash as percentage of total: {cash_percent:.2f}%")
+    else:
+        print("\nCash as percentage of total: 0.00%")
+
+    print("\nMerged Current Value by Group as Percentage of Total:\n")
+    print(to_report_string(merged))
+
+    print("")
+
+    if args.snapshot:
+        with stage("snapshot"):
+            store = SnapshotStore(args.snapshot_dir)
+            ingested = store.ingest_all(cache=cache)
+            recomputed = store.commit()
+        print(f"Recorded {ingested} new snapshot(s) in {store.root}, recomputed {len(recomputed)} merged date(s).\n")
+
+    if args.workers is not None:
+        print(f"Loaded {len(timings)} sources in {load_seconds:.3f}s with {args.workers} worker(s):")
+        for name, seconds in timings.items():
+            print(f"    {name}: {seconds:.3f}s")
+        print("")
+
+    if args.profile:
+        profiling.active().write(args.profile)
+        print(f"Wrote profile to {args.profile}\n")
+
+    if args.serve is not None:
+        watcher = PortfolioWatcher(cache=cache, interval=args.watch_interval, formats=tuple(args.formats))
+        server.run(watcher, args.host, args.serve, watch=args.watch)
+    elif args.watch:
+        PortfolioWatcher(cache=cache, interval=args.watch_interval, formats=tuple(args.formats)).run()
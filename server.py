@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+from watch import PortfolioWatcher
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Requests are tiny GETs; anything bigger is not a client of ours
+MAX_HEADER_LINE = 8192
+MAX_HEADERS = 100
+
+
+def _money(cents: int) -> float:
+    # Amounts are kept in cents; JSON clients get dollars
+    return int(cents) / 100
+
+
+def _percent(value: float) -> float:
+    return round(float(value), 4)
+
+
+def _allocation(grouped) -> list[dict]:
+    # A group without a description has NaN there, which is not valid JSON: it becomes null
+    value_column = "Total Current Value" if "Total Current Value" in grouped.columns else "Current Value"
+    return [
+        {
+            "group": group,
+            "description": description if isinstance(description, str) else None,
+            "value": _money(value),
+            "percentage": _percent(percentage),
+        }
+        for group, description, value, percentage in zip(
+            grouped["Group"], grouped["Description"], grouped[value_column], grouped["Percentage of Total"],
+        )
+    ]
+
+
+def build_views(watcher: PortfolioWatcher) -> dict[str, dict]:
+    # JSON documents for every endpoint, computed from the watcher's in-memory tables
+    totals = {name: positions["Current Value"].sum() for name, positions in watcher.positions.items()}
+    cash = {}
+    accounts = {}
+    for name, index in watcher.accounts.items():
+        value_cash = sum(index.cash(account) for account in index.accounts)
+        cash[name] = {
+            "cash": _money(value_cash),
+            "percentage": _percent(value_cash / totals[name] * 100) if totals[name] else None,
+        }
+        accounts[name] = {
+            account: {
+                "cash": _money(index.cash(account)),
+                "total": _money(index.total(account)),
+                "treasury": _money(index.treasury(account)),
+                "symbols": {symbol: _money(value) for symbol, value in index.cash_by_symbol(account).items()},
+            }
+            for account in index.accounts
+        }
+
+    merged = watcher.merged
+    cash_row = merged[merged["Group"] == "Cash"]
+    generated = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    views = {
+        "/total": {
+            "total": _money(watcher.total_merged),
+            "sources": {name: _money(total) for name, total in totals.items()},
+        },
+        "/cash": {
+            "percentage": _percent(cash_row["Percentage of Total"].iloc[0]) if not cash_row.empty else 0.0,
+            "sources": cash,
+        },
+        "/accounts/cash": accounts,
+        "/groups": _allocation(merged),
+    }
+    for name, grouped in watcher.grouped.items():
+        views[f"/groups/{name}"] = _allocation(grouped)
+    views["/"] = {"generated": generated, "endpoints": sorted(views)}
+    return views
+
+
+class HoldingsServer:
+    """Serves the consolidated holdings as JSON over HTTP/1.1 on localhost.
+
+    Every response body is serialized once per data refresh and kept together with
+    its ETag, so a request is a dictionary lookup and a write; clients that send a
+    matching If-None-Match get a 304. With watch=True the broker
+    directories are polled in the background and the views are rebuilt after a
+    source reloads, without restarting the server.
+    """
+
+    def __init__(self, watcher: PortfolioWatcher):
+        self.watcher = watcher
+        self._responses: dict[str, tuple[bytes, str]] = {}
+
+    def refresh(self) -> None:
+        responses = {}
+        for path, document in build_views(self.watcher).items():
+            # allow_nan=False: a NaN or infinity would be written as a bare token browsers reject
+            body = json.dumps(document, separators=(",", ":"), allow_nan=False).encode()
+            responses[path] = (body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"')
+        # Swapped in one assignment so handlers never see a half-built set
+        self._responses = responses
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.watcher.interval)
+            changed = self.watcher.poll()
+            if changed:
+                # Parsing blocks, so it runs off the event loop; requests keep being served meanwhile
+                reloaded = await loop.run_in_executor(None, self.watcher.reload, changed)
+                if reloaded:
+                    await loop.run_in_executor(None, self.refresh)
+                    print(f"Reloaded {', '.join(reloaded)}")
+
+    def _response(self, method: str, target: str, headers: dict[str, str]) -> tuple[HTTPStatus, bytes, dict[str, str]]:
+        if method not in ("GET", "HEAD"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, b'{"error":"method not allowed"}', {"Allow": "GET, HEAD"}
+        path = target.split("?", 1)[0].rstrip("/") or "/"
+        entry = self._responses.get(path)
+        if entry is None:
+            return HTTPStatus.NOT_FOUND, b'{"error":"not found"}', {}
+        body, etag = entry
+        extra = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+            return HTTPStatus.NOT_MODIFIED, b"", extra
+        return HTTPStatus.OK, body, extra
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                if len(request_line) > MAX_HEADER_LINE:
+                    break
+                parts = request_line.decode("latin1").split()
+                if len(parts) != 3:
+                    break
+                method, target, version = parts
+                headers = {}
+                for _ in range(MAX_HEADERS):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                status, body, extra = self._response(method, target, headers)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                head = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                    *(f"{name}: {value}" for name, value in extra.items()),
+                ]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin1"))
+                if method != "HEAD" and status is not HTTPStatus.NOT_MODIFIED:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, watch: bool = True) -> None:
+        if not self._responses:
+            await asyncio.get_running_loop().run_in_executor(None, self.refresh)
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"Serving holdings on http://{host}:{port}/ (Ctrl-C to stop)")
+        async with server:
+            if watch:
+                watcher_task = asyncio.create_task(self._watch())
+            try:
+                await server.serve_forever()
+            finally:
+                if watch:
+                    watcher_task.cancel()
+
+
+def run(watcher: PortfolioWatcher, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, watch: bool = True) -> None:
+    if not watcher.grouped:
+        watcher.reload(watcher.adapters)
+    if watcher.merged is None:
+        print("No exports loaded; nothing to serve.")
+        return
+    try:
+        asyncio.run(HoldingsServer(watcher).serve(host, port, watch))
+    except KeyboardInterrupt:
+        print("\nStopped serving.")
@@ -0,0 +1,420 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from brokers import (
+    BROKERS, CATEGORICAL_COLUMNS, BrokerAdapter, find_exports, group_positions,
+    keep_newest_accounts, latest_by_account, load_positions, merge_grouped, merge_stacked, snapshot_date,
+)
+from cache import ParseCache, file_digest, write_atomic, write_json
+from money import to_cents
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DEFAULT_SNAPSHOT_DIR = "data/snapshots"
+# 2: amounts are stored as int64 cents (version 1 stored float dollars)
+# 3: a partition keeps every export of its day
+# 4: holdings on a date come from that date's exports only, not from older days' accounts
+STORE_VERSION = 4
+
+# A commit that regroups more (source, date) pairs or re-merges more dates than this (a
+# backfill rather than a daily export) does so in one vectorized pass instead of per date
+BULK_THRESHOLD = 32
+
+GROUPED_COLUMNS = ["Date", "Source", "Group", "Description", "Current Value", "Percentage of Total"]
+MERGED_COLUMNS = ["Date", "Group", "Description", "Total Current Value", "Percentage of Total"]
+_COLUMN_DTYPES = {
+    "Date": "datetime64[ns]", "Current Value": "int64", "Total Current Value": "int64", "Percentage of Total": "float64",
+}
+
+# Measures available to allocation_history, by the table they are read from
+_MEASURE_COLUMNS = {
+    "percentage": {"merged": "Percentage of Total", "grouped": "Percentage of Total"},
+    "value": {"merged": "Total Current Value", "grouped": "Current Value"},
+}
+
+
+class SnapshotStore:
+    """Append-only history of daily broker snapshots.
+
+    Each ingested export is stored once, as Parquet partitioned by broker and date
+    (positions/source=<name>/date=<YYYY-MM-DD>/<digest>.parquet). As in the report,
+    a source's holdings on a date are latest_by_account over that date's exports, so
+    same-day exports of different accounts add up. Two derived tables are kept next
+    to the exports: the grouped holdings of every (source, date) and the merged
+    allocation of every date, where each source contributes its latest grouped date
+    on or before it. A new export only regroups its own (source, date) and re-merges
+    the dates that affects; a backfill touching many dates is regrouped and
+    re-merged in one vectorized pass.
+    """
+
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_DIR):
+        if pa is None:
+            raise ImportError("The snapshot store needs pyarrow: pip install 'portfolio[cache]'")
+        self.root = root
+        self._manifest_path = os.path.join(root, "manifest.json")
+        self._grouped_path = os.path.join(root, "grouped.parquet")
+        self._merged_path = os.path.join(root, "merged.parquet")
+
+        try:
+            with open(self._manifest_path) as f:
+                self._manifest = json.load(f)
+        except FileNotFoundError:
+            self._manifest = {"version": STORE_VERSION, "files": {}, "snapshots": {}}
+        self.grouped = self._read_table(self._grouped_path, GROUPED_COLUMNS)
+        self.merged = self._read_table(self._merged_path, MERGED_COLUMNS)
+        # Snapshots added or removed since the last commit, as (source, date)
+        self._changes: list[tuple[str, pd.Timestamp]] = []
+        self._rebuild = False
+
+        version = self._manifest.get("version", 1)
+        if version < 2:
+            # Stores written before amounts were kept in cents are converted on open
+            self.grouped["Current Value"] = to_cents(self.grouped["Current Value"])
+            self.merged["Total Current Value"] = to_cents(self.merged["Total Current Value"])
+        if version < STORE_VERSION:
+            self._upgrade()
+        # The stored snapshot of each (source, file, date), which a new version of that file replaces
+        self._by_file = {
+            (snapshot["source"], snapshot["file"], snapshot["date"]): digest
+            for digest, snapshot in self._manifest["snapshots"].items()
+        }
+
+    def _upgrade(self) -> None:
+        # Older stores kept one export per (source, date) and left the digests of the ones
+        # they replaced in the manifest. Those are dropped, the others get the mtime used to
+        # order a day's exports, and the next commit regroups every date.
+        files = self._manifest["files"]
+        for digest, snapshot in list(self._manifest["snapshots"].items()):
+            path = self._snapshot_path(digest, snapshot)
+            if not os.path.exists(path):
+                del self._manifest["snapshots"][digest]
+                continue
+            snapshot.setdefault("mtime_ns", files.get(snapshot["file"], {}).get("mtime_ns", 0))
+            # Version 3 kept the accounts of every export to carry them over to later dates
+            snapshot.pop("accounts", None)
+        self._manifest["version"] = STORE_VERSION
+        self._rebuild = True
+
+    @staticmethod
+    def _read_table(path: str, columns: list[str]) -> pd.DataFrame:
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+        return pd.DataFrame({column: pd.Series(dtype=_COLUMN_DTYPES.get(column, object)) for column in columns})
+
+    def _partition_dir(self, source: str, date: pd.Timestamp) -> str:
+        return os.path.join(self.root, "positions", f"source={source}", f"date={date:%Y-%m-%d}")
+
+    def _snapshot_path(self, digest: str, snapshot: dict) -> str:
+        return os.path.join(self._partition_dir(snapshot["source"], pd.Timestamp(snapshot["date"])), f"{digest}.parquet")
+
+    def _digest(self, file_path: str) -> str:
+        # Re-hash only files whose size or mtime changed since they were last seen
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        seen = self._manifest["files"].get(key)
+        if seen and seen["size"] == stat.st_size and seen["mtime_ns"] == stat.st_mtime_ns:
+            return seen["digest"]
+        digest = file_digest(file_path)
+        self._manifest["files"][key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+        return digest
+
+    def ingest(
+        self,
+        adapter: BrokerAdapter,
+        file_path: str,
+        date: str | pd.Timestamp | None = None,
+        cache: ParseCache | None = None,
+    ) -> bool:
+        # Store one export in its (source, date) partition, next to the other exports of that
+        # day. Returns False if this exact content was ingested before. A new version of a
+        # file already stored for the same day replaces it.
+        digest = self._digest(file_path)
+        if digest in self._manifest["snapshots"]:
+            return False
+        date = snapshot_date(file_path) if date is None else pd.Timestamp(date).normalize()
+        file_key = os.path.abspath(file_path)
+        day = f"{date:%Y-%m-%d}"
+
+        positions = load_positions(adapter, file_path, cache)
+        replaced = self._by_file.get((adapter.name, file_key, day))
+        if replaced is not None:
+            self._remove(replaced)
+        partition_dir = self._partition_dir(adapter.name, date)
+        os.makedirs(partition_dir, exist_ok=True)
+        write_atomic(
+            os.path.join(partition_dir, f"{digest}.parquet"),
+            lambda tmp: positions.reset_index(drop=True).to_parquet(tmp, index=False),
+        )
+        self._manifest["snapshots"][digest] = {
+            "source": adapter.name, "date": day, "file": file_key, "mtime_ns": self._manifest["files"][file_key]["mtime_ns"],
+        }
+        self._by_file[(adapter.name, file_key, day)] = digest
+        self._changes.append((adapter.name, date))
+        return True
+
+    def _remove(self, digest: str) -> None:
+        # Forget a snapshot, so its content can be ingested again later
+        snapshot = self._manifest["snapshots"].pop(digest)
+        del self._by_file[(snapshot["source"], snapshot["file"], snapshot["date"])]
+        try:
+            os.remove(self._snapshot_path(digest, snapshot))
+        except FileNotFoundError:
+            pass
+        self._changes.append((snapshot["source"], pd.Timestamp(snapshot["date"])))
+
+    def ingest_all(self, adapters=None, cache: ParseCache | None = None) -> int:
+        # Ingest every export found in the brokers' data directories
+        ingested = 0
+        for adapter in BROKERS.values() if adapters is None else adapters:
+            for file_path in find_exports(adapter):
+                ingested += self.ingest(adapter, file_path, cache=cache)
+        return ingested
+
+    def _read_snapshot_table(self, digest: str) -> "pa.Table":
+        table = pq.read_table(self._snapshot_path(digest, self._manifest["snapshots"][digest]))
+        i = table.schema.get_field_index("Current Value")
+        if pa.types.is_floating(table.schema.field(i).type):
+            # Partition written by a version 1 store, in dollars
+            table = table.set_column(i, "Current Value", pa.array(to_cents(table.column(i).to_numpy())))
+        for column in CATEGORICAL_COLUMNS:
+            # A column with no values at all (Schwab exports have no account numbers) is written
+            # by Parquet without its category dtype; restore it so the exports of every source stack
+            i = table.schema.get_field_index(column)
+            if i >= 0 and not pa.types.is_dictionary(table.schema.field(i).type) and table.column(i).null_count == table.num_rows:
+                table = table.set_column(i, column, pa.nulls(table.num_rows, pa.dictionary(pa.int32(), pa.string())))
+        return table
+
+    @staticmethod
+    def _to_positions(tables: list["pa.Table"]) -> pd.DataFrame:
+        # The exports stacked in order and converted to pandas once, which is far cheaper than
+        # concatenating many small frames and unifying their categories
+        return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
+    def _read_snapshot(self, digest: str) -> pd.DataFrame:
+        return self._to_positions([self._read_snapshot_table(digest)])
+
+    def _exports(self) -> dict[str, list[tuple]]:
+        # (date, mtime_ns, file, digest) of every stored export by source, oldest first in
+        # the same order the report loads a directory in
+        exports = {}
+        for digest, snapshot in self._manifest["snapshots"].items():
+            exports.setdefault(snapshot["source"], []).append(
+                (pd.Timestamp(snapshot["date"]), snapshot["mtime_ns"], snapshot["file"], digest)
+            )
+        for source_exports in exports.values():
+            source_exports.sort()
+        return exports
+
+    def _dirty_pairs(self, exports: dict[str, list[tuple]]) -> set[tuple[str, pd.Timestamp]]:
+        # The (source, date) pairs to regroup: a date's holdings only depend on its own exports
+        if self._rebuild:
+            pairs = {(source, export[0]) for source, source_exports in exports.items() for export in source_exports}
+            return pairs | set(zip(self.grouped["Source"], self.grouped["Date"]))
+        return set(self._changes)
+
+    def _day_positions(self, source_exports: list[tuple], date: pd.Timestamp) -> pd.DataFrame | None:
+        # The source's holdings on date, built like the report's: latest_by_account over that date's exports
+        frames = [self._read_snapshot(export[3]) for export in source_exports if export[0] == date]
+        return latest_by_account(frames) if frames else None
+
+    def _regroup_all(self, exports: dict[str, list[tuple]], dirty: set[tuple[str, pd.Timestamp]]) -> pd.DataFrame:
+        # The per-date regroup for many pairs at once: the exports of every dirty (source, date)
+        # are read into one frame, and latest_by_account and group_positions are applied per
+        # (source, date) in one pass each
+        needed = [
+            (order, export) for source, source_exports in exports.items()
+            for order, export in enumerate(source_exports) if (source, export[0]) in dirty
+        ]
+        if not needed:
+            return pd.DataFrame(columns=GROUPED_COLUMNS)
+        tables = [self._read_snapshot_table(export[3]) for _, export in needed]
+        rows = [table.num_rows for table in tables]
+        positions = self._to_positions(tables)
+        positions.insert(0, "Date", np.repeat(np.array([export[0] for _, export in needed], dtype="datetime64[ns]"), rows))
+        positions = keep_newest_accounts(positions, np.repeat([order for order, _ in needed], rows), keys=["Source", "Date"])
+        return group_positions(positions, keys=["Source", "Date"])[GROUPED_COLUMNS]
+
+    def _source_order(self, sources) -> list[str]:
+        # Registered brokers first, in registration order: the first one with a description wins in the merge
+        registered = [name for name in BROKERS if name in sources]
+        return registered + sorted(set(sources) - set(registered))
+
+    def _merge_as_of(self, date: pd.Timestamp, by_source: dict[str, pd.DataFrame]) -> pd.DataFrame | None:
+        grouped_by_source = {}
+        for source, grouped in by_source.items():
+            dates = grouped["Date"].to_numpy()
+            i = dates.searchsorted(np.datetime64(date), side="right")
+            if i == 0:
+                continue
+            latest = dates[i - 1]
+            lo = dates.searchsorted(latest, side="left")
+            grouped_by_source[source] = grouped.iloc[lo:i]
+        if not grouped_by_source:
+            return None
+        merged, _ = merge_grouped(grouped_by_source)
+        merged.insert(0, "Date", date)
+        return merged
+
+    @staticmethod
+    def _merge_all(dates: list[pd.Timestamp], by_source: dict[str, pd.DataFrame]) -> pd.DataFrame:
+        # _merge_as_of for many dates at once: merge_asof picks each source's latest grouped
+        # date on or before every date, and merge_stacked merges the rows of every date in
+        # one pass, stacked in source order so the first description still wins
+        targets = pd.DataFrame({"Date": pd.DatetimeIndex(dates, dtype="datetime64[ns]")})
+        stacked = []
+        for grouped in by_source.values():
+            source_dates = pd.DataFrame({"Source Date": pd.DatetimeIndex(grouped["Date"].unique(), dtype="datetime64[ns]")})
+            as_of = pd.merge_asof(targets, source_dates, left_on="Date", right_on="Source Date").dropna()
+            rows = grouped[["Date", "Group", "Description", "Current Value"]].rename(columns={"Date": "Source Date"})
+            stacked.append(as_of.merge(rows, on="Source Date"))
+        return merge_stacked(pd.concat(stacked, ignore_index=True), keys=["Date"])
+
+    @staticmethod
+    def _affected_dates(
+        dirty: set[tuple[str, pd.Timestamp]], by_source: dict[str, pd.DataFrame], all_dates: np.ndarray,
+    ) -> list[pd.Timestamp]:
+        # A regrouped date affects the merged view from that date until the source's next one
+        source_dates = {source: np.asarray(grouped["Date"].unique()) for source, grouped in by_source.items()}
+        change = np.zeros(len(all_dates) + 1, dtype="int64")
+        for source, date in dirty:
+            dates = source_dates.get(source, all_dates[:0])
+            later = dates.searchsorted(np.datetime64(date), side="right")
+            change[all_dates.searchsorted(np.datetime64(date))] += 1
+            change[all_dates.searchsorted(dates[later]) if later < len(dates) else len(all_dates)] -= 1
+        return [pd.Timestamp(date) for date in all_dates[np.cumsum(change[:-1]) > 0]]
+
+    def commit(self) -> list[pd.Timestamp]:
+        # Recompute the derived tables for everything ingested since the last commit
+        # and write them out. Returns the merged dates that were recomputed.
+        if not self._changes and not self._rebuild:
+            self._save_manifest()
+            return []
+        exports = self._exports()
+        dirty = self._dirty_pairs(exports)
+
+        # Regroup only the (source, date) pairs whose holdings changed; a pair left without
+        # an export of its own is dropped
+        fresh = []
+        if len(dirty) > BULK_THRESHOLD:
+            fresh.append(self._regroup_all(exports, dirty))
+        else:
+            for source, date in sorted(dirty):
+                positions = self._day_positions(exports.get(source, []), date)
+                if positions is None:
+                    continue
+                grouped = group_positions(positions)
+                grouped.insert(0, "Date", date)
+                grouped.insert(1, "Source", source)
+                fresh.append(grouped)
+        keys = pd.MultiIndex.from_frame(self.grouped[["Source", "Date"]])
+        dirty_keys = pd.MultiIndex.from_tuples(sorted(dirty), names=["Source", "Date"])
+        self.grouped = pd.concat([self.grouped[~keys.isin(dirty_keys)], *fresh], ignore_index=True)
+        self.grouped = self.grouped.sort_values(["Source", "Date"], kind="stable", ignore_index=True)
+
+        all_dates = np.sort(np.asarray(self.grouped["Date"].unique(), dtype="datetime64[ns]"))
+        by_source = {
+            source: self.grouped[self.grouped["Source"] == source]
+            for source in self._source_order(self.grouped["Source"].unique())
+        }
+        affected = self._affected_dates(dirty, by_source, all_dates)
+        if len(affected) > BULK_THRESHOLD:
+            remerged = [self._merge_all(affected, by_source)]
+        else:
+            remerged = [m for m in (self._merge_as_of(date, by_source) for date in affected) if m is not None]
+        # Dates no source has a snapshot for any more are dropped
+        kept = self.merged[~self.merged["Date"].isin(affected) & self.merged["Date"].isin(all_dates)]
+        self.merged = pd.concat([kept, *remerged], ignore_index=True)
+        self.merged = self.merged.sort_values(["Date", "Percentage of Total"], ascending=[True, False], ignore_index=True)
+
+        self._save_tables()
+        self._save_manifest()
+        self._changes.clear()
+        self._rebuild = False
+        return affected
+
+    def _save_tables(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        write_atomic(self._grouped_path, lambda tmp: self.grouped.to_parquet(tmp, index=False))
+        write_atomic(self._merged_path, lambda tmp: self.merged.to_parquet(tmp, index=False))
+
+    def _save_manifest(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        write_atomic(self._manifest_path, lambda tmp: write_json(tmp, self._manifest))
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.merged["Date"].unique())
+
+    def allocation(self, as_of: str | pd.Timestamp) -> pd.DataFrame:
+        # Merged allocation on the latest snapshot date on or before as_of
+        dates = self.merged["Date"].to_numpy()
+        i = dates.searchsorted(np.datetime64(pd.Timestamp(as_of)), side="right")
+        if i == 0:
+            return self.merged.iloc[0:0]
+        lo = dates.searchsorted(dates[i - 1], side="left")
+        return self.merged.iloc[lo:i].reset_index(drop=True)
+
+    def allocation_history(
+        self,
+        measure: str = "percentage",
+        source: str | None = None,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        groups: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Wide date x group matrix of "percentage" (Percentage of Total) or "value" (Current Value, in dollars).
+
+        Built from the merged allocation, or from one broker's grouped holdings when
+        source is given. Rows are snapshot dates between start and end (inclusive),
+        columns are groups ordered by their share on the last date; a group not held
+        (or below the report threshold) on a date is 0. The frame wraps a single
+        float64 NumPy array filled in one scatter, with no per-date loop.
+        """
+        if measure not in _MEASURE_COLUMNS:
+            raise ValueError(f"Unknown measure {measure!r}, expected one of {sorted(_MEASURE_COLUMNS)}.")
+        if source is None:
+            table, column = self.merged, _MEASURE_COLUMNS[measure]["merged"]
+        else:
+            table = self.grouped[self.grouped["Source"] == source]
+            column = _MEASURE_COLUMNS[measure]["grouped"]
+
+        # Both tables are sorted by date, so the range is a slice
+        dates = table["Date"].to_numpy()
+        lo = 0 if start is None else dates.searchsorted(np.datetime64(pd.Timestamp(start)), side="left")
+        hi = len(dates) if end is None else dates.searchsorted(np.datetime64(pd.Timestamp(end)), side="right")
+        table = table.iloc[lo:hi]
+
+        # Factorize dates before filtering groups so dates without those groups keep their (zero) row
+        date_codes, date_labels = pd.factorize(table["Date"], sort=True)
+        if groups is not None:
+            keep = table["Group"].isin(groups).to_numpy()
+            table, date_codes = table[keep], date_codes[keep]
+        group_codes, group_labels = pd.factorize(table["Group"])
+        matrix = np.zeros((len(date_labels), len(group_labels)))
+        matrix[date_codes, group_codes] = table[column].to_numpy(dtype="float64")
+        if measure == "value":
+            matrix /= 100
+
+        if groups is not None:
+            order = [group_labels.get_loc(g) for g in groups if g in group_labels]
+        else:
+            order = np.argsort(-matrix[-1], kind="stable") if len(matrix) else np.arange(len(group_labels))
+        return pd.DataFrame(
+            matrix[:, order],
+            index=pd.DatetimeIndex(date_labels, name="Date"),
+            columns=pd.Index(group_labels[order], name="Group"),
+        )
+
+    def cash_history(self, source: str | None = None, **kwargs) -> pd.Series:
+        # Cash as percentage of total over time
+        history = self.allocation_history("percentage", source=source, groups=["Cash"], **kwargs)
+        if "Cash" not in history.columns:
+            return pd.Series(0.0, index=history.index, name="Cash")
+        return history["Cash"]
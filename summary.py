@@ -0,0 +1,99 @@
+"""Compact JSON summary of the last report, for answering queries without pandas.
+
+Whenever the grouped outputs are written, the totals, cash, per-account cash and
+allocations are also saved to data/summary.json, amounts in integer cents, together
+with the name, size and mtime of every export they were computed from. A reader
+checks those signatures with os.stat alone: if no export was added, removed or
+touched since, the summary is current. This module only imports the standard
+library so the command line can use it before (or instead of) loading pandas.
+"""
+import json
+import os
+
+SUMMARY_PATH = "data/summary.json"
+SUMMARY_VERSION = 1
+
+
+def directory_signature(data_dir: str) -> tuple:
+    # Name, size and mtime of every CSV in the directory: one scandir, no reads
+    try:
+        with os.scandir(data_dir) as it:
+            return tuple(sorted(
+                (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in it
+                if entry.is_file() and entry.name.lower().endswith(".csv")
+            ))
+    except FileNotFoundError:
+        return ()
+
+
+def _rows(grouped) -> list[list]:
+    # [group, description, cents, percentage] per row of a grouped or merged table
+    value_column = "Total Current Value" if "Total Current Value" in grouped.columns else "Current Value"
+    return [
+        [group, description if isinstance(description, str) else None, int(value), float(percentage)]
+        for group, description, value, percentage in zip(
+            grouped["Group"], grouped["Description"], grouped[value_column], grouped["Percentage of Total"],
+        )
+    ]
+
+
+def build_summary(
+    adapters: list,
+    inputs: dict[str, tuple],
+    positions: dict,
+    accounts: dict,
+    grouped: dict,
+    merged,
+    total_merged: int,
+) -> dict:
+    # inputs maps each data directory to its directory_signature taken before loading;
+    # positions, accounts (AccountIndex) and grouped are keyed by source name
+    sources = {}
+    for adapter in adapters:
+        if adapter.name not in grouped:
+            continue
+        source_positions = positions[adapter.name]
+        index = accounts[adapter.name]
+        sources[adapter.name] = {
+            "label": adapter.label,
+            "total": int(source_positions["Current Value"].sum()),
+            "cash": int(source_positions.loc[source_positions["Group"] == "Cash", "Current Value"].sum()),
+            "cash_symbols": list(adapter.cash_symbols),
+            "accounts": {
+                account: {"cash": index.cash(account), "cash_symbols": index.cash_by_symbol(account)}
+                for account in index.accounts
+            },
+            "groups": _rows(grouped[adapter.name]),
+        }
+    cash_rows = merged[merged["Group"] == "Cash"]
+    return {
+        "version": SUMMARY_VERSION,
+        "inputs": {data_dir: [list(entry) for entry in signature] for data_dir, signature in inputs.items()},
+        "total": int(total_merged),
+        "cash_percentage": float(cash_rows["Percentage of Total"].iloc[0]) if not cash_rows.empty else 0.0,
+        "sources": sources,
+        "merged": _rows(merged),
+    }
+
+
+def write_summary(summary: dict, path: str = SUMMARY_PATH) -> None:
+    # Only called next to the pipeline, which has cache (and pandas) loaded already
+    from cache import write_atomic, write_json
+
+    write_atomic(path, lambda tmp: write_json(tmp, summary))
+
+
+def load_summary(path: str = SUMMARY_PATH) -> dict | None:
+    # The summary if it is current, else None
+    try:
+        with open(path) as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if summary.get("version") != SUMMARY_VERSION:
+        return None
+    for data_dir, signature in summary["inputs"].items():
+        if directory_signature(data_dir) != tuple(tuple(entry) for entry in signature):
+            return None
+    return summary
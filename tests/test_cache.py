@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import cache  # noqa: E402
+from cache import ParseCache  # noqa: E402
+
+
+def test_load_survives_eviction_by_another_process(tmp_path, monkeypatch):
+    parse_cache = ParseCache(str(tmp_path))
+    parse_cache.store("entry", pd.DataFrame({"Current Value": [1, 2]}))
+    read_table = cache.feather.read_table
+
+    def read_then_evict(path, **kwargs):
+        table = read_table(path, **kwargs)
+        os.remove(path)
+        return table
+
+    monkeypatch.setattr(cache.feather, "read_table", read_then_evict)
+    assert parse_cache.load("entry")["Current Value"].tolist() == [1, 2]
+
+
+def test_evict_prunes_sidecars_of_removed_exports(tmp_path):
+    parse_cache = ParseCache(str(tmp_path / "cache"))
+    kept, rotated = tmp_path / "Positions_Oct-17-2026.csv", tmp_path / "Positions_Oct-16-2026.csv"
+    for path in (kept, rotated):
+        path.write_text("Symbol\nAAPL\n")
+        parse_cache.digest("fidelity", str(path))
+    rotated.unlink()
+
+    parse_cache.store("entry", pd.DataFrame({"Current Value": [1]}))
+
+    assert os.path.exists(parse_cache._stat_path("fidelity", str(kept)))
+    assert not os.path.exists(parse_cache._stat_path("fidelity", str(rotated)))
@@ -0,0 +1,55 @@
+import io
+
+import pandas as pd
+
+from readers import read_csv_no_trailing_commas, read_fidelity_positions
+
+HEADER = "﻿Account Number,Account Name,Symbol,Description,Current Value,Type\r\n"
+
+
+def read_csv_python_engine(path: str) -> pd.DataFrame:
+    # The original reader: whole file in memory, python engine
+    with open(path, "r", encoding="latin1") as f:
+        cleaned = []
+        for line in f:
+            stripped = line.rstrip("\r\n")
+            if stripped.endswith(","):
+                stripped = stripped[:-1]
+            cleaned.append(stripped + "\n")
+    df = pd.read_csv(io.StringIO("".join(cleaned)), engine="python", skip_blank_lines=True)
+    return df.loc[:, ~df.columns.str.contains(r"^Unnamed")]
+
+
+def write_export(path, n_rows: int, odd_rows: set[int]) -> None:
+    # "32213" everywhere except a few "X77788987" rows near the end
+    with open(path, "w", encoding="latin1", newline="") as f:
+        f.write(HEADER.encode("utf-8").decode("latin1"))
+        for i in range(n_rows):
+            number = "X77788987" if i in odd_rows else "32213"
+            f.write(f"{number},Geospace,S{i % 97:04d},SOCI\xc9T\xc9 {i % 13},$1{i % 1000}.25,Cash,\r\n")
+        f.write("\r\n")
+        f.write('"Date downloaded Oct-18-2026 10:00 p.m ET"\r\n')
+
+
+def test_matches_python_engine_past_one_parser_chunk(tmp_path):
+    # The C parser's low_memory mode infers types 262144 rows at a time
+    path = tmp_path / "Portfolio_Positions_Oct-18-2026.csv"
+    n_rows = 600_000
+    write_export(path, n_rows, odd_rows={n_rows - 10, n_rows - 5, n_rows - 1})
+
+    df = read_csv_no_trailing_commas(str(path))
+
+    pd.testing.assert_frame_equal(df, read_csv_python_engine(str(path)))
+    # Column 0 still carries the BOM here; read_fidelity_positions strips it
+    numbers = df.iloc[:n_rows, 0]
+    assert numbers.map(type).eq(str).all()
+    assert numbers.isin(("32213", "X77788987")).all()
+
+
+def test_header_is_cleaned(tmp_path):
+    path = tmp_path / "Portfolio_Positions_Oct-18-2026.csv"
+    write_export(path, 3, odd_rows=set())
+
+    df = read_fidelity_positions(str(path))
+
+    assert list(df.columns) == ["Account Number", "Account Name", "Symbol", "Description", "Current Value", "Type"]
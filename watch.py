@@ -0,0 +1,128 @@
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from brokers import (
+    BROKERS, MERGED_OUTPUT_PATH, AccountIndex, BrokerAdapter, group_positions, load_source, merge_grouped,
+)
+from cache import ParseCache
+from exports import write_outputs
+from profiling import stage
+from summary import build_summary, directory_signature, write_summary
+
+
+class PortfolioWatcher:
+    """Keeps the report outputs up to date while exports are dropped into the data directories.
+
+    The directories are polled with os.scandir; a source counts as changed once its
+    CSV files differ from what was last loaded and have stayed the same for one more
+    poll (so half-written downloads are not parsed). Only changed sources are
+    reparsed and regrouped; the grouped tables of the others stay in memory, so an
+    update costs one parse plus a merge of small tables before grouped_<source>.csv
+    and grouped_merged.csv are rewritten.
+    """
+
+    def __init__(
+        self,
+        adapters=None,
+        cache: ParseCache | None = None,
+        interval: float = 0.25,
+        formats: tuple[str, ...] = ("csv",),
+    ):
+        self.adapters = list(BROKERS.values() if adapters is None else adapters)
+        self.cache = cache
+        self.interval = interval
+        self.formats = formats
+        self.positions: dict[str, pd.DataFrame] = {}
+        self.grouped: dict[str, pd.DataFrame] = {}
+        self.accounts: dict[str, AccountIndex] = {}
+        self.merged: pd.DataFrame | None = None
+        self.total_merged = 0
+        self._loaded: dict[str, tuple] = {}
+        self._pending: dict[str, tuple] = {}
+        # Directory signature of the exports each source's positions were loaded from
+        self._inputs: dict[str, tuple] = {}
+
+    def poll(self) -> list[BrokerAdapter]:
+        # Sources whose exports changed and have settled since the previous poll
+        changed = []
+        for adapter in self.adapters:
+            signature = directory_signature(adapter.data_dir)
+            if signature == self._loaded.get(adapter.name):
+                self._pending.pop(adapter.name, None)
+            elif self._pending.get(adapter.name) == signature:
+                changed.append(adapter)
+            else:
+                self._pending[adapter.name] = signature
+        return changed
+
+    def reload(self, adapters: list[BrokerAdapter]) -> list[str]:
+        # Reparse the given sources, rewrite their grouped CSVs and the merged CSV.
+        # Returns the names of the sources that were reloaded; failures are reported on stderr.
+        reloaded = []
+        for adapter in adapters:
+            signature = directory_signature(adapter.data_dir)
+            self._loaded[adapter.name] = signature
+            self._pending.pop(adapter.name, None)
+            try:
+                positions = load_source(adapter, self.cache)
+            except FileNotFoundError as e:
+                print(e, file=sys.stderr)
+                continue
+            except Exception as e:
+                # Keep serving the previous snapshot until the exports change again
+                print(f"Could not load {adapter.data_dir}: {e}", file=sys.stderr)
+                continue
+            with stage("group", source=adapter.name):
+                grouped = group_positions(positions)
+            self.positions[adapter.name] = positions
+            self.grouped[adapter.name] = grouped
+            self.accounts[adapter.name] = AccountIndex(adapter, positions)
+            self._inputs[adapter.name] = signature
+            reloaded.append(adapter.name)
+
+        if reloaded:
+            grouped_by_source = {a.name: self.grouped[a.name] for a in self.adapters if a.name in self.grouped}
+            with stage("merge"):
+                self.merged, self.total_merged = merge_grouped(grouped_by_source)
+            outputs = {a.output_path: self.grouped[a.name] for a in self.adapters if a.name in reloaded}
+            outputs[MERGED_OUTPUT_PATH] = self.merged
+            with stage("write_outputs", formats=self.formats):
+                write_outputs(outputs, formats=self.formats)
+                # Like the report, the summary covers every source or is not written: a
+                # source that failed keeps the signature it was last loaded from, so an
+                # older summary goes stale instead of answering without it
+                if all(a.name in self._inputs for a in self.adapters):
+                    write_summary(build_summary(
+                        self.adapters, {a.data_dir: self._inputs[a.name] for a in self.adapters},
+                        self.positions, self.accounts, self.grouped, self.merged, self.total_merged,
+                    ))
+        return reloaded
+
+    def _print_update(self, reloaded: list[str], seconds: float) -> None:
+        cash_row = self.merged[self.merged["Group"] == "Cash"]
+        cash_percent = cash_row["Percentage of Total"].iloc[0] if not cash_row.empty else 0.0
+        print(
+            f"[{datetime.now():%H:%M:%S}] Reloaded {', '.join(reloaded)} in {seconds * 1000:.0f} ms: "
+            f"total ${round(self.total_merged / 100):,}, cash {cash_percent:.2f}%"
+        )
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        reloaded = self.reload(self.adapters)
+        if reloaded:
+            self._print_update(reloaded, time.perf_counter() - start)
+        print(f"Watching {', '.join(a.data_dir for a in self.adapters)} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(self.interval)
+                changed = self.poll()
+                if changed:
+                    start = time.perf_counter()
+                    reloaded = self.reload(changed)
+                    if reloaded:
+                        self._print_update(reloaded, time.perf_counter() - start)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")